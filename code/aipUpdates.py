@@ -1,34 +1,145 @@
 #!/usr/bin/python3
 
-import collections
+import argparse
+import concurrent.futures
+import json
 import os
 import re
 import subprocess
-import argparse
- 
-# create parser
-parser = argparse.ArgumentParser(
-    description='List the RFCs set in an Aries Interop Profile (AIP) that have subsequently evolved. ' +
-    'By default, the AIPs in the local version of the file are processed. A specific version can be ' +
-    'specified, and then only that AIP version is processed. The AIP version can be a previous (not current) ' +
-    'AIP.  Optionally, the diffs between RFCs set in processed AIP and the "main" branch can be included.')
- 
-# add arguments to the parser
-parser.add_argument('--version', '-v', help='The AIP version to display. Defaults to the current version(s) in the local file')
-parser.add_argument('--diffs', '-d', dest='diffs', action='store_true',
-                    help='Display the diffs of any updated RFCs found')
-parser.add_argument('--list', '-l', help='List the RFCs and commits in the AIP with a prefixed by the name of a (for example) shell script')
- 
-# parse the arguments
-args = parser.parse_args()
+import sys
 
 aip_path = './concepts/0302-aries-interop-profile/README.md'
 
+# How many git diffs to run at once
+WORKERS = 8
+
 # Regular expressions to find an AIP header and an entry in the AIP RFC list
 _aip_pat = re.compile(r'^[ \t]*#+[ \t]*Aries Interop Profile Version: ([1-9]*.[0-9]*.[0-9]*)?[ \t]*$')
-_aip_commit_and_file = '(.*?)(tree/)([0-9a-f]*)(/)(.*?)(\).*$)'
+_aip_commit_and_file = re.compile(r'(.*?)(tree/)([0-9a-f]*)(/)(.*?)(\).*$)')
+_aip_link_pat = re.compile(r'^- \[([1-9]*.[0-9]*.[0-9]*)\]\((.*)\)')
+_tree_commit_pat = re.compile(r'/(?:tree|blob|raw)/([0-9a-f]{7,40})(?:/|$)')
+
+
+def parse_args(argv=None):
+    # create parser
+    parser = argparse.ArgumentParser(
+        description='List the RFCs set in an Aries Interop Profile (AIP) that have subsequently evolved. ' +
+        'By default, the AIPs in the local version of the file are processed. A specific version can be ' +
+        'specified, and then only that AIP version is processed. The AIP version can be a previous (not current) ' +
+        'AIP.  Optionally, the diffs between RFCs set in processed AIP and the "main" branch can be included.')
+
+    # add arguments to the parser
+    parser.add_argument('--version', '-v', help='The AIP version to display. Defaults to the current version(s) in the local file')
+    parser.add_argument('--diffs', '-d', dest='diffs', action='store_true',
+                        help='Display the diffs of any updated RFCs found')
+    parser.add_argument('--list', '-l', help='List the RFCs and commits in the AIP with a prefixed by the name of a (for example) shell script')
+    parser.add_argument('--branch', '-b', default='main', help='The branch to compare the AIP commits against. Defaults to main')
+    parser.add_argument('--all-versions', '-a', action='store_true',
+                        help='Also process every previous AIP version listed in the file, read from git history')
+    parser.add_argument('--format', '-f', choices=['text', 'json'], default='text',
+                        help='text (default), or json: one record per AIP RFC with its pinned and latest commits, '
+                        'whether it changed, and a diffstat')
+    parser.add_argument('--workers', '-j', type=int, default=WORKERS, help='How many git diffs to run at once')
+    return parser.parse_args(argv)
+
+
+class GitObjects:
+    """
+    Reads objects through one long-running `git cat-file --batch` process, rather
+    than starting a git process for every question.
+    """
+
+    def __init__(self, cwd=None):
+        self.proc = subprocess.Popen(['git', 'cat-file', '--batch'], cwd=cwd,
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.oids = {}
+
+    def get(self, rev):
+        """Return (object id, type, content) for a rev like 'main:features/0036-issue-credential', or None."""
+        self.proc.stdin.write(rev.encode('utf-8') + b'\n')
+        self.proc.stdin.flush()
+        header = self.proc.stdout.readline().split()
+        # A missing or ambiguous rev comes back as '<rev> missing' with no content.
+        if len(header) != 3:
+            return None
+        oid, kind, size = header
+        content = self.proc.stdout.read(int(size) + 1)[:-1]
+        return oid.decode('ascii'), kind.decode('ascii'), content
+
+    def oid(self, rev):
+        if rev not in self.oids:
+            found = self.get(rev)
+            self.oids[rev] = found[0] if found else None
+        return self.oids[rev]
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+
+class AipRepo:
+    """
+    The questions aipUpdates asks git about the RFCs an AIP pins, each asked once
+    however many AIP lines share a commit or an RFC.
+    """
+
+    def __init__(self, branch='main', cwd=None):
+        self.branch = branch
+        self.cwd = cwd
+        self.objects = GitObjects(cwd)
+        self.latest = {}
+
+    def git(self, *args):
+        return subprocess.run(['git'] + list(args), cwd=self.cwd, stdout=subprocess.PIPE).stdout.decode('utf-8')
+
+    def has_commit(self, commit):
+        return self.objects.oid(commit + '^{commit}') is not None
+
+    def changed(self, commit, protocol):
+        # Equal tree ids mean nothing under protocol differs, so no diff is needed to tell.
+        return self.objects.oid('%s:%s' % (commit, protocol)) != self.objects.oid('%s:%s' % (self.branch, protocol))
+
+    def latest_commit(self, protocol):
+        if protocol not in self.latest:
+            self.latest[protocol] = self.git('log', '-n', '1', '--pretty=format:%H', self.branch, '--', protocol)
+        return self.latest[protocol]
+
+    def diff(self, commit, protocol, option=None):
+        """Return `git diff` of protocol between commit and the branch, with an option like --numstat."""
+        return self.git('diff', *([option] if option else []), commit, self.branch, '--', protocol)
+
+    def map(self, option, records, workers=WORKERS):
+        """Return diff(option) for each record's pinned commit and RFC, run across a pool of git processes."""
+        with concurrent.futures.ThreadPoolExecutor(max(1, workers)) as pool:
+            return list(pool.map(lambda x: self.diff(x['pinned'], x['rfc'], option), records))
+
+    def close(self):
+        self.objects.close()
+
 
-def readAIP( aip_path, version ):
+# The AIP README as of each commit that a previous version links to
+_aip_at_commit = {}
+
+
+def readAIPAt( aip_path, commit, link, objects=None ):
+    """
+    Return the lines of aip_path as of commit, read from the local git objects. Only
+    if the commit isn't in this clone is the raw file downloaded from link.
+    """
+    key = commit or link
+    if key not in _aip_at_commit:
+        found = None
+        if objects and commit:
+            found = objects.get('%s:%s' % (commit, os.path.normpath(aip_path).replace('\\', '/')))
+        if found:
+            txt = found[2].decode('utf-8')
+        else:
+            txt = subprocess.run(['curl', '-L', '--silent', link.replace('tree', 'raw')], stdout=subprocess.PIPE).stdout.decode('utf-8')
+        _aip_at_commit[key] = txt.splitlines(True)
+    return _aip_at_commit[key]
+
+
+def readAIP( aip_path, version, objects=None ):
     # Open the local file and see if there is a version in it or in a previous file.
     lines = open(aip_path, "r").readlines()
     if not(version):
@@ -42,51 +153,120 @@ def readAIP( aip_path, version ):
                 # Version is defined in the local file
                 return lines
         # Check the list of previous versions
-        aip_link = re.search('^- \[([1-9]*.[0-9]*.[0-9]*)\]\((.*)\)', line)
+        aip_link = re.search(_aip_link_pat, line)
         if aip_link:
             if aip_link.group(1) == version:
-                # Found it - read in the raw version of the file from github and we'll use that
-                lines = subprocess.run(['curl', '-L', '--silent', aip_link.group(2).replace('tree', 'raw')], stdout=subprocess.PIPE).stdout.decode('utf-8')
-                return lines
+                # Found it - read the file as of the commit the version links to
+                commit = re.search(_tree_commit_pat, aip_link.group(2))
+                return readAIPAt(aip_path, commit.group(1) if commit else None, aip_link.group(2), objects)
     # Uh-oh - all the way through the file and no version found. Error and out...
     print('Error: AIP version %s not found' % (version))
-    exit(1)
-
-# Read the local file and if necessary a previous version of the local file
-txt = readAIP( aip_path, args.version )
-
-# Tracks if the changed RFCs for this AIP version should be listted
-ListVersionRFCs = True
-
-# Iterate through the file
-for line in txt:
-    # Version line?
-    aip_version = re.search(_aip_pat, line)
-    if aip_version:
-        # Check if we want all the AIPs in the file or this one
-        if ( not(args.version) or aip_version.group(1) == args.version ):
-            print("# Aries Interop Profile: %s" % (aip_version.group(1)))
-            ListVersionRFCs = True
-        else:
-            # Not this one...don't list the changed version
-            ListVersionRFCs = False
-    
-    rfc = re.search(_aip_commit_and_file, line)
-    # Is this an AIP RFC line? Is it in an RFC we want to list?
-    if ( rfc and ListVersionRFCs ):
-        # From the RFC line, get the commit ID and protocol file
-        commit = rfc.group(3)
-        protocol = rfc.group(5)
-        changed = re.search(protocol, subprocess.run(['git', 'diff', '--name-only', commit, 'main'], stdout=subprocess.PIPE).stdout.decode('utf-8'))
-        # Has this RFC changed since it was set in the RFC?
-        if args.list:
-            print('%s %s %s' % (args.list, protocol, commit))
-        elif changed:
-            # Yes - list it.
-            print('>>>>>>>> Changed protocol: %s, latest commit to protocol: %s' % (protocol, 
-                subprocess.run(['git', 'log', '-n', '1', '--pretty=format:%H', '--', protocol], stdout=subprocess.PIPE).stdout.decode('utf-8')))
-            if args.diffs:
-                # If we're showing diffs, then show the diffs
-                print('')
-                print(subprocess.run(['git', 'diff', commit, 'main', protocol], stdout=subprocess.PIPE).stdout.decode('utf-8'))
-exit()
+    sys.exit(1)
+
+
+def aipSections( lines, version=None ):
+    """
+    Return [(AIP version, [(RFC path, pinned commit), ...]), ...] for the versions in
+    lines, or only for version if one is given. RFC lines before any version header
+    come first, under None.
+    """
+    sections = [(None, [])]
+    # Tracks if the RFCs for this AIP version should be listed
+    ListVersionRFCs = True
+    for line in lines:
+        # Version line?
+        aip_version = re.search(_aip_pat, line)
+        if aip_version:
+            # Check if we want all the AIPs in the file or this one
+            ListVersionRFCs = not(version) or aip_version.group(1) == version
+            if ListVersionRFCs:
+                sections.append((aip_version.group(1), []))
+        # Links to previous versions of this RFC aren't RFCs in the AIP
+        rfc = None if re.search(_aip_link_pat, line) else re.search(_aip_commit_and_file, line)
+        # Is this an AIP RFC line? Is it in an RFC we want to list?
+        if ( rfc and ListVersionRFCs ):
+            # From the RFC line, get the protocol file and the commit ID
+            sections[-1][1].append((rfc.group(5), rfc.group(3)))
+    return sections if sections[0][1] else sections[1:]
+
+
+def previousVersions( aip_path, objects=None ):
+    """Return the sections of every previous AIP version listed in aip_path, each read as of its commit."""
+    sections = []
+    for line in open(aip_path, "r").readlines():
+        aip_link = re.search(_aip_link_pat, line)
+        if aip_link:
+            commit = re.search(_tree_commit_pat, aip_link.group(2))
+            lines = readAIPAt(aip_path, commit.group(1) if commit else None, aip_link.group(2), objects)
+            sections += aipSections(lines, aip_link.group(1))
+    return sections
+
+
+def parse_numstat(txt):
+    files = insertions = deletions = 0
+    for line in txt.splitlines():
+        added, deleted, path = line.split('\t', 2)
+        files += 1
+        # Binary files show '-' for both counts.
+        insertions += int(added) if added.isdigit() else 0
+        deletions += int(deleted) if deleted.isdigit() else 0
+    return {'files': files, 'insertions': insertions, 'deletions': deletions}
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    repo = AipRepo(args.branch)
+    try:
+        # Read the local file and if necessary a previous version of the local file
+        txt = readAIP( aip_path, args.version, repo.objects )
+        sections = aipSections(txt, args.version)
+        if args.all_versions:
+            sections += previousVersions(aip_path, repo.objects)
+
+        records = []
+        for aip, rfcs in sections:
+            if args.format == 'text' and aip is not None:
+                print("# Aries Interop Profile: %s" % (aip))
+            if args.list:
+                for protocol, commit in rfcs:
+                    print('%s %s %s' % (args.list, protocol, commit))
+                continue
+            changed = []
+            for protocol, commit in rfcs:
+                record = {'aip': aip, 'rfc': protocol, 'pinned': commit, 'latest': None, 'changed': None,
+                          'diffstat': None}
+                records.append(record)
+                if args.format == 'json':
+                    # The branch's latest commit to the RFC, whether or not it has changed since the AIP
+                    record['latest'] = repo.latest_commit(protocol) or None
+                if not repo.has_commit(commit):
+                    sys.stderr.write('Warning: commit %s for %s is not in this clone; fetch the full history.\n'
+                                     % (commit, protocol))
+                    continue
+                # Has this RFC changed since it was set in the RFC?
+                record['changed'] = repo.changed(commit, protocol)
+                if record['changed']:
+                    record['latest'] = repo.latest_commit(protocol)
+                    changed.append(record)
+            if args.format == 'json':
+                # Diffstats for the changed RFCs, generated in parallel
+                for record, numstat in zip(changed, repo.map('--numstat', changed, args.workers)):
+                    record['diffstat'] = parse_numstat(numstat)
+                continue
+            # If we're showing diffs, then generate them in parallel and show them in order
+            diffs = repo.map(None, changed, args.workers) if args.diffs else [None] * len(changed)
+            for record, diff in zip(changed, diffs):
+                print('>>>>>>>> Changed protocol: %s, latest commit to protocol: %s' % (record['rfc'], record['latest']))
+                if args.diffs:
+                    print('')
+                    print(diff)
+        if args.format == 'json' and not args.list:
+            json.dump(records, sys.stdout, indent=2)
+            print('')
+    finally:
+        repo.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+"""
+Time the code/ tooling, either against the RFCs in this repo or against synthetic RFC
+trees several times its size.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import check_links
+import generate_index
+import rfcs
+
+# The per-field extractors that rfcs.parse_rfc() used before it switched to a single
+# pass; kept here, as they were, as the baseline to compare against.
+_legacy_field = lambda x: re.compile(r'^[ \t]*[-*][ \t]*' + x + '[ \t]*:[ \t*](.*?)$', re.I | re.M)
+_legacy_title_pat = re.compile(r'\s*#[ \t]*(?:(?:Aries )?RFC )?(\d\d\d\d)[ \t]*:[ \t]*(.*?)$', re.I | re.M)
+_legacy_status_val_pat = re.compile(r'\[[ \t]*(\w+)')
+_legacy_extractors = [_legacy_field(label) for label in [
+    'Authors?', 'Status', '(?:Since|Status[-_ ]?Date)', 'Status[-_ ]?Note', 'Start[-_ ]?Date', 'Supersedes',
+    'Superseded[-_ ]?By', 'Tags']]
+
+
+# The regex-driven impl table reader that rfcs._read_impl_table() replaced.
+_legacy_impl_pat = re.compile(r'^[ \t]*#+[ \t]*Implementations?[ \t]*$', re.M)
+_legacy_impl_table_head_pat = re.compile(
+    r'^[ \t]*([|][ \t]*)?Name(.*?)[|](.*?)\n[ \t]*([|][ \t]*)?-+(.*?)*[|](.*?)\n', re.M)
+_legacy_impl_table_row_pat = re.compile(r'((.*?)[|](.*?))\n')
+
+
+def legacy_impl_table(txt):
+    m = _legacy_impl_pat.search(txt)
+    if m:
+        m = _legacy_impl_table_head_pat.search(txt, m.end())
+        if m:
+            i = m.end()
+            rows = []
+            while True:
+                m = _legacy_impl_table_row_pat.match(txt, i)
+                if not m: break
+                row = [x.strip() for x in m.group(1).split('|')]
+                if row[0] or row[1]:
+                    rows.append(row)
+                i = m.end()
+            return rows
+
+
+def legacy_parse(abspath, txt):
+    m = _legacy_title_pat.search(txt)
+    if m:
+        num, title = m.group(1), m.group(2)
+    else:
+        num, title = '', ''
+    fields = []
+    for ex in _legacy_extractors:
+        m = ex.search(txt)
+        if m:
+            fields.append(m.group(1))
+        else:
+            fields.append('')
+    rpath = rfcs.relpath(abspath)
+    segments = rpath.split('/')
+    status = fields[1]
+    m = _legacy_status_val_pat.search(status)
+    if m:
+        status = m.group(1)
+    tags = [rfcs.unlink_tag(x) for x in fields[7].split(',')]
+    content_idx = txt.find('\n##')
+    impl_table = legacy_impl_table(txt)
+    impl_count = len(impl_table) if impl_table else 0
+    return rfcs.RFC(title, abspath, rpath, segments[-3], segments[-2], num, fields[0], status, fields[2],
+                    fields[3], fields[4], fields[5], fields[6], tags, content_idx, impl_count, impl_table)
+
+
+def load_corpus():
+    corpus = []
+    for abspath in rfcs.walk_files():
+        with open(abspath, 'rt', encoding='utf-8') as f:
+            corpus.append((abspath, f.read()))
+    return corpus
+
+
+def time_parser(parse, corpus, repeat):
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        for abspath, txt in corpus:
+            parse(abspath, txt)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_parse(repeat):
+    corpus = load_corpus()
+    for abspath, txt in corpus:
+        # The impl table readers differ by design; see test_impl_table_matches_legacy.
+        if legacy_parse(abspath, txt)[:-2] != rfcs.parse_rfc(abspath, txt)[:-2]:
+            raise AssertionError('parsers disagree on ' + rfcs.relpath(abspath))
+    legacy = time_parser(legacy_parse, corpus, repeat)
+    # tuple() builds the lazy fields too, so this compares like with like.
+    current = time_parser(lambda abspath, txt: tuple(rfcs.parse_rfc(abspath, txt)), corpus, repeat)
+    light = time_parser(rfcs.parse_rfc, corpus, repeat)
+    print('Parsed %d RFCs, best of %d runs:' % (len(corpus), repeat))
+    print('  per-field regexes: %8.2f ms' % (legacy * 1000))
+    print('  single pass:       %8.2f ms' % (current * 1000))
+    print('  speedup:           %8.2fx' % (legacy / current))
+    print('  light fields only: %8.2f ms' % (light * 1000))
+    legacy = time_parser(lambda abspath, txt: legacy_impl_table(txt), corpus, repeat)
+    current = time_parser(lambda abspath, txt: rfcs.get_impl_table(txt), corpus, repeat)
+    print('Read %d impl tables, best of %d runs:' % (len(corpus), repeat))
+    print('  regex rows:        %8.2f ms' % (legacy * 1000))
+    print('  table reader:      %8.2f ms' % (current * 1000))
+
+
+# How many RFC folders the repo had when the scale benchmarks were calibrated.
+BASE_RFC_COUNT = 134
+_words = ('agent message protocol credential issuer holder verifier connection DID wallet '
+          'thread decorator attachment mediator transport ledger proof schema presentation '
+          'problem report state role invitation key routing').split()
+_statuses = ['ADOPTED', 'ACCEPTED', 'DEMONSTRATED', 'PROPOSED', 'STALLED', 'RETIRED']
+_sections = ['Summary', 'Motivation', 'Tutorial', 'Reference', 'Drawbacks', 'Rationale and alternatives',
+             'Prior art', 'Unresolved questions']
+
+
+def _sentence(rnd):
+    return ' '.join(rnd.choice(_words) for i in range(rnd.randint(8, 20))).capitalize() + '.'
+
+
+def _folder(i, category):
+    return '%s/%04d-synthetic-%s-%d' % (category, i, category[:-1], i)
+
+
+def make_rfc(rnd, i, folders):
+    """Return the text of a synthetic README.md shaped like the ones in this repo."""
+    category = folders[i].split('/')[0]
+    tags = [category[:-1]] + (['protocol'] if rnd.random() < 0.5 else [])
+    out = ['# Aries RFC %04d: Synthetic %s %d\n' % (i, _sentence(rnd)[:30].strip(), i),
+           '- Authors: [Author %d](mailto:author%d@example.com)' % (i % 50, i % 50),
+           '- Status: [%s](/README.md#%s)' % (_statuses[i % 6], _statuses[i % 6].lower()),
+           '- Since: 20%02d-%02d-%02d' % (19 + i % 6, 1 + i % 12, 1 + i % 28),
+           '- Status Note: %s' % _sentence(rnd),
+           '- Start Date: 2019-%02d-%02d' % (1 + i % 12, 1 + i % 28)]
+    if i and rnd.random() < 0.1:
+        out.append('- Supersedes: [RFC %04d](../../%s/README.md)' % (i - 1, folders[i - 1]))
+    out.append('- Tags: ' + ', '.join('[%s](/tags.md#%s)' % (t, t) for t in tags))
+    for section in _sections:
+        out.append('\n## %s\n' % section)
+        for p in range(rnd.randint(1, 4)):
+            para = [_sentence(rnd) for j in range(rnd.randint(3, 8))]
+            # Cross-links to other RFCs, usually to a real heading, sometimes to a missing one.
+            other = rnd.randrange(len(folders))
+            fragment = rnd.choice(_sections + ['No such section']).lower().replace(' ', '-')
+            para.append('See [RFC %04d](../../%s/README.md#%s).' % (other, folders[other], fragment))
+            if rnd.random() < 0.3:
+                para.append('More at [the spec](https://example.com/spec/%d).' % rnd.randrange(1000))
+            out.append(' '.join(para) + '\n')
+    out.append('\n## Implementations\n')
+    out.append('Name / Link | Implementation Notes\n--- | ---')
+    for r in range(rnd.randint(0, 6)):
+        out.append('[Agent %d](https://github.com/example/agent-%d) | Notes for %s. [test results](/tests.md#%d)'
+                   % (r, r, _sentence(rnd)[:40], r))
+    if 'protocol' in tags:
+        out.append('[Aries Protocol Test Suite](https://github.com/hyperledger/aries-protocol-test-suite) | '
+                   '[test results](/tests.md)')
+    return '\n'.join(out) + '\n'
+
+
+def make_corpus(root, scale, seed=0):
+    """Write BASE_RFC_COUNT * scale synthetic RFCs under root/concepts and root/features."""
+    rnd = random.Random(seed)
+    count = int(BASE_RFC_COUNT * scale)
+    folders = [_folder(i, 'concepts' if i % 3 == 0 else 'features') for i in range(count)]
+    total = 0
+    for i, folder in enumerate(folders):
+        path = os.path.join(root, folder)
+        os.makedirs(path)
+        txt = make_rfc(rnd, i, folders)
+        with open(os.path.join(path, 'README.md'), 'wt', encoding='utf-8') as f:
+            f.write(txt)
+        total += len(txt)
+    return count, total
+
+
+@contextlib.contextmanager
+def repo_root(root):
+    """Point the tooling at root instead of this repo."""
+    saved = rfcs.root_folder, check_links.ROOT_FOLDER
+    rfcs.root_folder = check_links.ROOT_FOLDER = root
+    try:
+        yield
+    finally:
+        rfcs.root_folder, check_links.ROOT_FOLDER = saved
+
+
+def measure(fn, memory):
+    """Run fn; return wall seconds and, if memory, peak traced bytes from a second run."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        peak = None
+        if memory:
+            tracemalloc.start()
+            try:
+                fn()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench_scale(scale, workers=None, memory=True):
+    """Time each stage of the tooling against a fresh synthetic tree; return a result dict."""
+    with tempfile.TemporaryDirectory() as root:
+        start = time.perf_counter()
+        count, size = make_corpus(root, scale)
+        result = {'scale': scale, 'rfcs': count, 'bytes': size,
+                  'generate_corpus_s': time.perf_counter() - start, 'stages': {}}
+        index = os.path.join(root, 'index.md')
+
+        def read(fname):
+            with open(fname, 'rt', encoding='utf-8') as f:
+                return f.read()
+
+        def read_all():
+            return [(x, read(x)) for x in rfcs.walk_files()]
+
+        with repo_root(root):
+            texts = read_all()
+            stages = [
+                ('read', read_all),
+                ('walk', lambda: list(rfcs.walk(cache=False))),
+                ('walk_cached', lambda: list(rfcs.walk())),
+                ('get_impl_table', lambda: [rfcs.get_impl_table(txt) for path, txt in texts]),
+                ('check_links', lambda: check_links.main()),
+                ('generate_index', lambda: generate_index.main(index)),
+            ]
+            if workers:
+                stages.insert(2, ('walk_parallel', lambda: list(rfcs.walk(cache=False, workers=workers))))
+            # Prime the walk cache so walk_cached measures a warm run.
+            list(rfcs.walk())
+            for name, fn in stages:
+                elapsed, peak = measure(fn, memory)
+                result['stages'][name] = {'wall_s': elapsed, 'peak_bytes': peak}
+    return result
+
+
+def report(results, out):
+    for result in results:
+        out.write('%gx: %d RFCs, %.1f MB\n' % (result['scale'], result['rfcs'], result['bytes'] / 1e6))
+        for name, stage in result['stages'].items():
+            peak = '' if stage['peak_bytes'] is None else '%10.1f MB peak' % (stage['peak_bytes'] / 1e6)
+            out.write('  %-16s %10.1f ms%s\n' % (name, stage['wall_s'] * 1000, peak))
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser('Benchmark RFC tooling')
+    sub = ap.add_subparsers(dest='command')
+    # add_subparsers() only takes required= from Python 3.7
+    sub.required = True
+    p = sub.add_parser('parse', help='compare the single-pass parser with the per-field regexes on this repo')
+    p.add_argument('--repeat', type=int, default=20, help='how many times to time each parser')
+    p = sub.add_parser('scale', help='time each tool against synthetic trees')
+    p.add_argument('--scales', type=float, nargs='+', default=[1, 10, 100],
+                   help='tree sizes, as multiples of %d RFCs' % BASE_RFC_COUNT)
+    p.add_argument('--workers', type=int, default=None, help='also time rfcs.walk() across this many processes')
+    p.add_argument('--no-memory', dest='memory', action='store_false',
+                   help='skip the second, traced run that measures peak memory')
+    p.add_argument('--json', metavar='FILE', help='also write the results to FILE as JSON')
+    args = ap.parse_args()
+    if args.command == 'parse':
+        bench_parse(args.repeat)
+    else:
+        results = []
+        for scale in args.scales:
+            results.append(bench_scale(scale, args.workers, args.memory))
+            report(results[-1:], sys.stdout)
+        if args.json:
+            with open(args.json, 'wt', encoding='utf-8') as f:
+                json.dump({'python': sys.version.split()[0], 'time': time.time(), 'results': results}, f, indent=2)
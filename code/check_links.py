@@ -1,14 +1,24 @@
+import argparse
+import collections
+import concurrent.futures
+import json
 import os
 import re
 import requests
+import subprocess
 import sys
+import threading
+import time
 import traceback
-import urllib
+import urllib.parse
+
+from link_graph import Edge, LinkGraph
 
 ROOT_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 LINK_PAT = re.compile(r'\[([^[(]+)\][(]([^)]+)\)', re.S)
 RFC_NAME_PAT = re.compile(r'\d{4}-[-_.a-z0-9]+', re.I)
-HTML_ANCHOR_PAT_TXT = r'<a[ \t\r\n]+[^>]*name=[\'"]X[\'"]'
+HTML_ANCHOR_PAT = re.compile(r'<a[ \t\r\n]+([^>]*)', re.I)
+HTML_ANCHOR_NAME_PAT = re.compile(r'name=[\'"]([^\'"]*)[\'"]', re.I)
 MD_ANCHOR_PAT = re.compile(r'^[ \t]*(?:\[[^]]+\][ \t]*:[ \t]*)?#+[ \t]*(.*)$', re.MULTILINE)
 COMMON_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/74.0.3729.169 Safari/537.36'
 # The following URI patterns give errors even when we http HEAD them.
@@ -21,6 +31,14 @@ SKIP_PATS = [
 COMMIT_HASH_URI_PAT = re.compile('.*://github.com/hyperledger/[a-zA-Z-_]+/blob/[a-f0-9]+/text/([a-zA-Z0-9_-]+)(/.*)?$')
 SHORTENER_PAT = re.compile('http://(bit.ly|t.co|goo.gl|youtu.be)')
 EMAIL_PAT = re.compile(r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)")
+# How many HTTP probes run at once, overall and against any one host.
+WEB_WORKERS = 16
+WEB_WORKERS_PER_HOST = 4
+# Roughly how many bytes of markdown text to hold in memory at once.
+CONTENT_BUDGET = 32 * 1024 * 1024
+# How long, in hours, a remembered web check stays good across runs.
+WEB_CACHE_TTL = 7 * 24
+WEB_CACHE_FAIL_TTL = 12
 
 
 def make_md_anchor(txt):
@@ -36,18 +54,77 @@ def make_md_anchor(txt):
     return anchor
 
 
-def fragment_in_content(fragment, content, ct):
+def get_anchors(content, ct):
+    """Return the set of fragments that a link into content of type ct may use."""
+    anchors = set()
     if "html" in ct:
-        pat = re.compile(HTML_ANCHOR_PAT_TXT.replace('X', fragment), re.I or re.S)
-        if pat.search(content):
-            return True
+        # <a name=...> matching is case-insensitive, so keep names lowercased.
+        for tag in HTML_ANCHOR_PAT.finditer(content):
+            for name in HTML_ANCHOR_NAME_PAT.finditer(tag.group(1)):
+                anchors.add(name.group(1).lower())
     else:
-        found = False
         for anchor_match in MD_ANCHOR_PAT.finditer(content):
-            if make_md_anchor(anchor_match.group(1)) == fragment:
-                found = True
-                break
-        return found
+            anchors.add(make_md_anchor(anchor_match.group(1)))
+    return anchors
+
+
+class LinkCache(dict):
+    """
+    What we've learned so far about each uri, path and uri#fragment, as (error, None)
+    pairs, plus the text of the .md files being checked. Only about budget bytes of
+    text (counted as UTF-8) are held at once: the least recently used is evicted, and
+    read again from disk if needed. The anchor set derived from each file outlives
+    its text.
+    """
+
+    def __init__(self, budget=CONTENT_BUDGET):
+        super().__init__()
+        self.budget = budget
+        self.size = 0
+        self.texts = collections.OrderedDict()
+        self.text_sizes = {}
+        self.anchor_sets = {}
+
+    def read(self, path):
+        txt = self.texts.get(path)
+        if txt is not None:
+            self.texts.move_to_end(path)
+            return txt
+        with open(path, "rt", encoding='utf-8') as f:
+            txt = f.read()
+        self.texts[path] = txt
+        self.text_sizes[path] = len(txt.encode('utf-8'))
+        self.size += self.text_sizes[path]
+        while self.size > self.budget and len(self.texts) > 1:
+            evicted_path, evicted = self.texts.popitem(last=False)
+            self.size -= self.text_sizes.pop(evicted_path)
+        return txt
+
+    def anchors(self, path, ct):
+        """Return get_anchors() for the file at path, scanning it only the first time."""
+        anchors = self.anchor_sets.get(path)
+        if anchors is None:
+            anchors = self.anchor_sets[path] = get_anchors(self.read(path), ct)
+        return anchors
+
+    def forget(self, paths):
+        """
+        Drop the text and anchors of the files at paths, which changed on disk, along
+        with every remembered link result, since any of them may depend on those files.
+        """
+        self.clear()
+        for path in paths:
+            if self.texts.pop(path, None) is not None:
+                self.size -= self.text_sizes.pop(path)
+            self.anchor_sets.pop(path, None)
+
+
+def fragment_in_content(fragment, content, ct, anchors=None):
+    if anchors is None:
+        anchors = get_anchors(content, ct)
+    if "html" in ct:
+        fragment = fragment.lower()
+    return fragment in anchors
 
 
 def should_skip_website(uri):
@@ -56,16 +133,21 @@ def should_skip_website(uri):
             return True
 
 
-def handle_local_file(relative_to_fname, uri, cache):
-    error = None
-    content = None
+def resolve_local_file(relative_to_fname, uri):
     if uri.startswith('/'):
         path = ROOT_FOLDER + uri
     else:
         path = os.path.join(os.path.dirname(relative_to_fname), uri)
-    path = os.path.normpath(path)
+    return os.path.normpath(path)
+
+
+def handle_local_file(relative_to_fname, uri, cache):
+    """Return (error, content type or None if we can't look inside, path) for a local link."""
+    error = None
+    ct = None
+    path = resolve_local_file(relative_to_fname, uri)
     if path in cache:
-        error, content = cache[path]
+        error, ct = cache[path]
     else:
         if not os.path.exists(path):
             error = "does not exist"
@@ -73,10 +155,9 @@ def handle_local_file(relative_to_fname, uri, cache):
             if os.path.isdir(path):
                 error = "should link to README.md rather than folder"
             elif path.endswith('.md'):
-                with open(path, 'rt', encoding='utf-8') as f:
-                    content = f.read()
-        cache[path] = (error, content)
-    return error, content, path
+                ct = "text/markdown"
+        cache[path] = (error, ct)
+    return error, ct, path
 
 
 def find_matching_rfc(rfcs, which):
@@ -89,6 +170,71 @@ def find_matching_rfc(rfcs, which):
             return rfc
 
 
+class WebCache:
+    """
+    Web check results kept on disk between runs, as {uri: {status, content_type,
+    checked_at}}. Successes stay fresh for ttl hours and failures for fail_ttl hours;
+    with refresh, nothing read from disk counts as fresh.
+    """
+
+    def __init__(self, fname=None, ttl=WEB_CACHE_TTL, fail_ttl=WEB_CACHE_FAIL_TTL, refresh=False):
+        self.fname = fname or os.path.join(ROOT_FOLDER, '.cache', 'check_links-web.json')
+        self.ttl = ttl * 3600
+        self.fail_ttl = fail_ttl * 3600
+        self.refresh = refresh
+        self.entries = {}
+        try:
+            with open(self.fname, 'rt', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def get(self, uri):
+        """Return the remembered result for uri if it hasn't expired, else None."""
+        entry = self.entries.get(uri)
+        if entry and not self.refresh:
+            ttl = self.fail_ttl if status_error(entry['status']) else self.ttl
+            if time.time() - entry['checked_at'] < ttl:
+                return entry
+
+    def put(self, uri, status, ct):
+        self.entries[uri] = {'status': status, 'content_type': ct, 'checked_at': time.time()}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.fname), exist_ok=True)
+        tmp_fname = self.fname + '.tmp'
+        with open(tmp_fname, 'wt', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_fname, self.fname)
+
+
+def needs_web_probe(uri, rfcs):
+    """Return True if handle_web_resource would have to go to the network for uri."""
+    if SHORTENER_PAT.match(uri):
+        return False
+    m = COMMIT_HASH_URI_PAT.match(uri)
+    if m and find_matching_rfc(rfcs, m.group(1)):
+        return False
+    return True
+
+
+def head_web_resource(uri, session=requests):
+    """HTTP HEAD uri and return its (status code, content type) pair."""
+    ct = None
+    r = session.head(uri, headers={'User-Agent': COMMON_USER_AGENT}, timeout=10)
+    if 200 <= r.status_code <= 299:
+        ct = r.headers['content-type']
+        i = ct.find(';')
+        if i > -1:
+            ct = ct[:i]
+    return r.status_code, ct
+
+
+def status_error(status):
+    if status < 200 or status > 299:
+        return "returns HTTP status code " + str(status)
+
+
 def handle_web_resource(uri, rfcs, cache):
     error = None
     ct = None
@@ -105,31 +251,95 @@ def handle_web_resource(uri, rfcs, cache):
             if rfc:
                 error = 'should reference RFC %s' % rfc
         if not error:
-            r = requests.head(uri, headers={'User-Agent': COMMON_USER_AGENT}, timeout=10)
-            if r.status_code < 200 or r.status_code > 299:
-                error = "returns HTTP status code " + str(r.status_code)
-            else:
-                ct = r.headers['content-type']
-                i = ct.find(';')
-                if i > -1:
-                    ct = ct[:i]
+            status, ct = head_web_resource(uri)
+            error = status_error(status)
         cache[uri] = (error, None)
     return error, ct
 
 
+class WebProber:
+    """
+    Probe many URIs at once on a bounded thread pool, reusing one connection pool per
+    host and never running more than per_host probes against the same host.
+    """
+
+    def __init__(self, workers=WEB_WORKERS, per_host=WEB_WORKERS_PER_HOST):
+        self.workers = workers
+        self.per_host = per_host
+        self.lock = threading.Lock()
+        self.hosts = {}
+
+    def _host(self, uri):
+        host = urllib.parse.urlsplit(uri).netloc.lower()
+        with self.lock:
+            if host not in self.hosts:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.per_host)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self.hosts[host] = (session, threading.BoundedSemaphore(self.per_host))
+            return self.hosts[host]
+
+    def probe(self, uri):
+        session, slots = self._host(uri)
+        status = ct = None
+        with slots:
+            try:
+                status, ct = head_web_resource(uri, session)
+                error = status_error(status)
+            except BaseException:
+                # check_link reports an exception from requests as its traceback.
+                error = traceback.format_exc()
+        return uri, error, status, ct
+
+    def probe_all(self, uris, cache, web_cache=None):
+        """
+        Probe uris and record each result in cache the way handle_web_resource would.
+        Results still fresh in web_cache are reused instead of probed, and new HTTP
+        results are remembered there.
+        """
+        if web_cache:
+            todo = []
+            for uri in uris:
+                entry = web_cache.get(uri)
+                if entry:
+                    cache[uri] = (status_error(entry['status']), None)
+                else:
+                    todo.append(uri)
+            uris = todo
+        with concurrent.futures.ThreadPoolExecutor(self.workers) as pool:
+            for uri, error, status, ct in pool.map(self.probe, uris):
+                cache[uri] = (error, None)
+                # Don't remember timeouts and other exceptions; try again next run.
+                if web_cache and status is not None:
+                    web_cache.put(uri, status, ct)
+
+    def close(self):
+        for session, slots in self.hosts.values():
+            session.close()
+
+
+def get_uri(match):
+    """What's exactly the uri as it appears in the markdown link?"""
+    uri = match.group(2).strip()
+    if uri.startswith('<') and uri.endswith('>'):
+        uri = uri[1:-1].strip()
+    return uri
+
+
 def check_link(fname, short_fname, txt, match, rfcs, cache, problem_count_in_file_thus_far, full_check):
     """Look at a link and return an error string about it, if any."""
     error = None
-    # What's exactly the uri as it appears in the markdown link?
-    full_uri = match.group(2).strip()
-    if full_uri.startswith('<') and full_uri.endswith('>'):
-        full_uri = full_uri[1:-1].strip()
+    full_uri = get_uri(match)
     uri = full_uri
     try:
-        if uri in cache:
+        # Results are remembered by what a link resolves to, never by how it is spelled,
+        # since the cache is shared by every file checked. Only web uris are their own target.
+        if uri.startswith('http') and uri in cache:
             error, content = cache[uri]
         else:
-            content = None
+            # The file whose anchors a fragment must match, if we can look inside.
+            anchor_path = None
             ct = "text/markdown"
             # Split into most-of-uri + fragment
             fragment = None
@@ -149,9 +359,10 @@ def check_link(fname, short_fname, txt, match, rfcs, cache, problem_count_in_fil
                 return None
             # If URI is empty, then the URI is relative to the open file, so it was probably a pure fragment
             elif uri == '':
-                content = txt
+                anchor_path = uri = fname
             else:
-                error, content, uri = handle_local_file(fname, uri, cache)
+                error, ct, uri = handle_local_file(fname, uri, cache)
+                anchor_path = uri
             # If we got this far without an error, the only other thing to check is whether the fragment
             # is valid.
             if (not error) and fragment:
@@ -159,7 +370,8 @@ def check_link(fname, short_fname, txt, match, rfcs, cache, problem_count_in_fil
                 if cacheable in cache:
                     error, content = cache[cacheable]
                 else:
-                    if ct and content and (not fragment_in_content(fragment, content, ct)):
+                    if ct and anchor_path and (not fragment_in_content(
+                            fragment, None, ct, cache.anchors(anchor_path, ct))):
                         error = "#%s not in %s content" % (fragment, ct)
                     # Cache what we learned about the specific URI+fragment
                     cache[cacheable] = (error, None)
@@ -177,43 +389,172 @@ def check_link(fname, short_fname, txt, match, rfcs, cache, problem_count_in_fil
     return error
 
 
-def check_links(fname, rfcs, cache, full_check):
+def repo_relpath(path):
+    return os.path.relpath(path, ROOT_FOLDER).replace('\\', '/')
+
+
+def link_node(fname, uri):
+    """Name the link graph node that uri, linked from fname, points to (None for email)."""
+    fragment = ''
+    i = uri.find('#')
+    if i > -1:
+        fragment = uri[i:]
+        uri = uri[:i]
+    if uri.startswith('http'):
+        parts = urllib.parse.urlsplit(uri)
+        return '%s://%s' % (parts.scheme, parts.netloc.lower())
+    if uri.startswith('mailto:') or EMAIL_PAT.match(uri):
+        return None
+    path = resolve_local_file(fname, uri) if uri else fname
+    return repo_relpath(path) + fragment
+
+
+def check_links(fname, rfcs, cache, full_check, graph=None):
     relative_fname = os.path.relpath(fname, ROOT_FOLDER)
     sys.stdout.write(relative_fname.ljust(80, ' ') + '\r')
     error_count = 0
-    if fname not in cache:
-        with open(fname, "rt", encoding='utf-8') as f:
-            txt = f.read()
-        cache[fname] = (None, txt)
-    else:
-        txt = cache[fname][1]
+    edges = []
+    src = repo_relpath(fname)
+    txt = cache.read(fname)
     for match in LINK_PAT.finditer(txt):
-        if check_link(fname, relative_fname, txt, match, rfcs, cache, error_count, full_check):
+        error = check_link(fname, relative_fname, txt, match, rfcs, cache, error_count, full_check)
+        if error:
             error_count += 1
+        if graph is not None:
+            uri = get_uri(match)
+            dst = link_node(fname, uri)
+            if dst:
+                edges.append(Edge(src, dst, uri, error))
+    if graph is not None:
+        graph.set_edges(src, edges)
     return error_count
 
 
+def changed_since(ref):
+    """
+    Return the set of files (relative to the repo root) that differ from git ref in the
+    working tree, including untracked ones, or None if git can't tell us.
+    """
+    try:
+        diff = subprocess.run(['git', 'diff', '--name-only', '--relative', '--no-renames', ref, '--'],
+                              cwd=ROOT_FOLDER, stdout=subprocess.PIPE, check=True).stdout
+        untracked = subprocess.run(['git', 'ls-files', '--others', '--exclude-standard'],
+                                   cwd=ROOT_FOLDER, stdout=subprocess.PIPE, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    changed = set()
+    for path in (diff + untracked).decode('utf-8').splitlines():
+        # A link to a folder is affected by any change inside it.
+        while path and path not in changed:
+            changed.add(path)
+            path = os.path.dirname(path)
+    return changed
+
+
+def graph_file():
+    return os.path.join(ROOT_FOLDER, '.cache', 'link-graph.json')
+
+
+def find_web_uris(fnames, rfcs, cache):
+    """List, without duplicates, the web resources that the links in fnames would HEAD."""
+    uris = {}
+    for fname in fnames:
+        for match in LINK_PAT.finditer(cache.read(fname)):
+            uri = get_uri(match)
+            i = uri.find('#')
+            if i > -1:
+                uri = uri[:i]
+            if uri.startswith('http') and uri not in cache and not should_skip_website(uri) \
+                    and needs_web_probe(uri, rfcs):
+                uris[uri] = None
+    return list(uris)
+
+
 def get_rfcs(folder):
     return [x for x in os.listdir(folder) if RFC_NAME_PAT.match(x) and os.path.isdir(os.path.join(folder, x))]
 
 
-def main(full_check = False):
-    error_count = 0
+def find_corpus():
+    """Return the RFC folder names and the paths of the .md files whose links get checked."""
     folders = [x for x in map(lambda x: os.path.join(ROOT_FOLDER, x), ["concepts", "features"]) if os.path.isdir(x)]
     rfcs = []
     for starting_point in folders:
         rfcs += get_rfcs(starting_point)
-    cache = {}
+    fnames = []
     for starting_point in folders:
         for root, dirs, files in os.walk(starting_point):
             for file in files:
                 if file.endswith('.md'):
-                    error_count += check_links(os.path.join(root, file), rfcs, cache, full_check)
+                    fnames.append(os.path.join(root, file))
+    return rfcs, fnames
+
+
+def main(full_check = False, workers = WEB_WORKERS, per_host = WEB_WORKERS_PER_HOST, web_cache = None, since = None, export = None,
+         budget = CONTENT_BUDGET):
+    error_count = 0
+    rfcs, fnames = find_corpus()
+    cache = LinkCache(budget)
+    graph = None
+    if since:
+        # Only check what changed since the given git ref, plus everything that the
+        # link graph saved by the last run says links to it.
+        graph = LinkGraph.load(graph_file())
+        changed = changed_since(since) if graph else None
+        if changed is None:
+            sys.stderr.write('No saved link graph or no git diff against %s; checking everything.\n' % since)
+            graph = None
+        else:
+            wanted = changed | graph.linkers_of(changed)
+            for src in list(graph.edges):
+                if src in changed and not os.path.exists(os.path.join(ROOT_FOLDER, src)):
+                    graph.remove(src)
+            fnames = [x for x in fnames if repo_relpath(x) in wanted]
+    if graph is None and (since or export):
+        # The graph is only worth its memory if it will be saved for --since or exported.
+        graph = LinkGraph()
+    if full_check:
+        # Do the slow part, talking to websites, concurrently up front; the checks
+        # below then find every web result in the cache.
+        if web_cache is None:
+            web_cache = WebCache()
+        prober = WebProber(workers, per_host)
+        try:
+            prober.probe_all(find_web_uris(fnames, rfcs, cache), cache, web_cache)
+        finally:
+            prober.close()
+        web_cache.save()
+    for fname in fnames:
+        error_count += check_links(fname, rfcs, cache, full_check, graph)
+    if since or export:
+        try:
+            graph.save(graph_file())
+        except OSError:
+            pass
+    if export:
+        graph.export_jsonl(export)
     print('%s\n%d errors.' % (''.rjust(80), error_count))
     return error_count
 
 
 if __name__ == '__main__':
-    full_check = (len(sys.argv) > 1 and sys.argv[1] == '--full')
-    error_count = main(full_check)
+    ap = argparse.ArgumentParser('Check links in RFCs')
+    ap.add_argument('--full', action='store_true', help='also check links to external websites')
+    ap.add_argument('--workers', type=int, default=WEB_WORKERS, help='how many websites to check at once')
+    ap.add_argument('--per-host', type=int, default=WEB_WORKERS_PER_HOST,
+                    help='how many checks may run against one website at once')
+    ap.add_argument('--ttl', type=float, default=WEB_CACHE_TTL,
+                    help='hours to trust a remembered successful website check (default %(default)s)')
+    ap.add_argument('--fail-ttl', type=float, default=WEB_CACHE_FAIL_TTL,
+                    help='hours to trust a remembered failed website check (default %(default)s)')
+    ap.add_argument('--refresh', action='store_true', help='re-check every website, ignoring remembered results')
+    ap.add_argument('--since', metavar='REF',
+                    help='only check files changed since this git ref, and the files that the link graph '
+                    'saved by the last --since or --graph run says link to them')
+    ap.add_argument('--graph', metavar='FILE', help='write the link graph to FILE as JSON Lines')
+    ap.add_argument('--memory-budget', type=float, default=CONTENT_BUDGET / 1024 / 1024, metavar='MB',
+                    help='how much markdown text to keep in memory (default %(default)s)')
+    args = ap.parse_args()
+    web_cache = WebCache(ttl=args.ttl, fail_ttl=args.fail_ttl, refresh=args.refresh)
+    error_count = main(args.full, args.workers, args.per_host, web_cache, args.since, args.graph,
+                       int(args.memory_budget * 1024 * 1024))
     sys.exit(error_count)
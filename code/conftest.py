@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+
+# We're not using python packages, so we have to solve the path problem the old way.
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import rfcs
+
+
+class SyntheticRFCs:
+    """
+    Makes up the README of an RFC from the metadata a test cares about, and parses it
+    or writes it to disk. Each RFC lives in features/<folder>, by default <num>-sample.
+    """
+
+    def text(self, num='9999', title='Sample', status='PROPOSED', since='2024-01-01',
+             authors='[Alice](mailto:alice@example.com)', tags=('feature',), fields=None, impls=None):
+        """
+        fields holds any other metadata lines, like {'Supersedes': '[RFC 0001](...)'};
+        impls, if given, the rows of an Implementations table.
+        """
+        lines = ['# Aries RFC %s: %s' % (num, title), '- Authors: ' + authors,
+                 '- Status: [%s](/README.md#%s)' % (status, status.lower()), '- Since: ' + since]
+        lines += ['- %s: %s' % (label, value) for label, value in (fields or {}).items()]
+        lines.append('- Tags: ' + ', '.join('[%s](/tags.md#%s)' % (tag, tag) for tag in tags))
+        lines += ['', '## Summary', '']
+        if impls is not None:
+            lines += ['## Implementations', '', 'Name / Link | Notes', '--- | ---'] + list(impls) + ['']
+        return '\n'.join(lines)
+
+    def abspath(self, num, folder=None, root=None):
+        return os.path.join(root or rfcs.root_folder, 'features', folder or '%s-sample' % num, 'README.md')
+
+    def parse(self, num='9999', folder=None, **metadata):
+        return rfcs.parse_rfc(self.abspath(num, folder), self.text(num, **metadata))
+
+    def write(self, root, num='9999', folder=None, **metadata):
+        """Write the RFC under root and return its path."""
+        path = self.abspath(num, folder, root)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wt', encoding='utf-8') as f:
+            f.write(self.text(num, **metadata))
+        return path
+
+
+@pytest.fixture
+def synthetic_rfc():
+    return SyntheticRFCs()
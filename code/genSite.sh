@@ -6,6 +6,9 @@
 rm -rf docs/*
 mkdir -p docs
 
+# Regenerate index.md, tags.md and mkdocs_index.yml from the RFCs in one pass
+python code/generate_all.py
+
 # Root folder -- README.md
 cp -r contributing.md github-issues.md MAINTAINERS.md README.md SECURITY.md tags.md 0000*.md *.png collateral docs
 cp LICENSE docs/LICENSE.md
@@ -14,9 +17,6 @@ sed -e "s#/tags.md#tags.md#g" index.md > docs/RFCindex.md
 # Features and Concept -- collect all of the RFCs
 cp -r features concepts docs
 
-# Update the index.md file
-python code/generate_index.py
-
 # Make a copy of AIP 2 RFCs using the right commit for each
 python code/aipUpdates.py -v 2.0 -l "./code/cpAIPs.sh" | \
    sed -e "/0317-please-ack/d" -e "/0587-encryption-envelope-v2/d" -e "/0627-static-peer-dids/d" \
@@ -70,7 +70,6 @@ echo "- AIP 2.0:" >>${MKDOCSTMP}
 for i in docs/aip2/*/README.md ; do head -n 1 $i | sed -e "s/# /    - /" -e "s/: / /" -e "s#\$#: $i#" -e "s#docs/##" -e "s/Aries RFC //"; done >>${MKDOCSTMP}
 
 # Navigation for all RFCs by Status
-python code/generate_mkdocs_index.py
 cat ${MKDOCSIDX} >>${MKDOCSTMP}
 rm ${MKDOCSIDX}
 
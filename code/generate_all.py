@@ -0,0 +1,70 @@
+"""
+Walk the RFCs once and regenerate every file derived from their metadata: index.md,
+mkdocs_index.yml and the list of RFCs by tag at the end of tags.md. Outputs whose
+content has not changed are left alone. With --check, nothing is written; the exit
+code says whether the committed outputs are current. With --impl-matrix FOLDER, the
+implementation x RFC matrix (see generate_impl_matrix.py) is written there from the
+same walk.
+"""
+import argparse
+import os
+import sys
+
+import generate_impl_matrix
+import generate_index
+import generate_mkdocs_index
+import generate_tags
+import rfcs
+
+
+def render_all(catalog):
+    """Return {file name relative to the repo root: text} for every generated output."""
+    with open(os.path.join(rfcs.root_folder, 'tags.md'), 'rt', encoding='utf-8') as f:
+        tags_txt = f.read()
+    return {
+        'index.md': generate_index.render(catalog),
+        'mkdocs_index.yml': generate_mkdocs_index.render(catalog),
+        'tags.md': generate_tags.render(catalog, tags_txt),
+    }
+
+
+# The outputs kept in git; mkdocs_index.yml only exists while genSite.sh runs.
+COMMITTED = ['index.md', 'tags.md']
+
+
+def main(out_folder = None, workers = None, check = False, matrix_folder = None):
+    """
+    Regenerate the outputs, or with check, return the names of committed outputs that
+    are stale. If matrix_folder is given, the impl matrix is written there too.
+    """
+    out_folder = out_folder or rfcs.root_folder
+    catalog = rfcs.catalog(rfcs.walk(workers=workers))
+    stale = []
+    for name, txt in render_all(catalog).items():
+        fname = os.path.join(out_folder, name)
+        if check:
+            if name in COMMITTED and rfcs.write_if_changed(fname, txt, check=True):
+                print('%s is out of date. Run python code/generate_all.py.' % fname)
+                stale.append(name)
+            continue
+        result = rfcs.write_if_changed(fname, txt)
+        print('%s %s.' % (result, fname) if result else 'No change to %s.' % fname)
+    if matrix_folder and not check:
+        for name, result in generate_impl_matrix.write(matrix_folder, catalog).items():
+            fname = os.path.join(matrix_folder, name)
+            print('%s %s.' % (result, fname) if result else 'No change to %s.' % fname)
+    return stale
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser('Generate index.md, mkdocs_index.yml and tags.md')
+    ap.add_argument('out_folder', metavar='FOLDER', nargs='?', default=None,
+                    help='write the outputs here instead of the repo root')
+    ap.add_argument('--workers', '-j', type=int, default=None, help='parse RFCs across this many processes')
+    ap.add_argument('--check', action='store_true',
+                    help="don't write; exit 1 if index.md or tags.md is out of date")
+    ap.add_argument('--impl-matrix', metavar='FOLDER', default=None,
+                    help='also write impl-matrix.md, .csv and .json into this folder')
+    args = ap.parse_args()
+    if main(args.out_folder, args.workers, args.check, args.impl_matrix):
+        sys.exit(1)
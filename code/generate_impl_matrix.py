@@ -0,0 +1,102 @@
+"""
+Render which implementations support which RFCs, from the impl tables of every RFC:
+impl-matrix.md lists the RFCs of each impl, impl-matrix.csv has a row per RFC and a
+column per impl, and impl-matrix.json holds the same data for tools. Impls are the
+hyperlinked rows of impl tables, grouped by normalized name as in impls.Registry.
+"""
+import argparse
+import collections
+import csv
+import io
+import json
+import os
+
+import impls
+import rfcs
+
+NAMES = ['impl-matrix.md', 'impl-matrix.csv', 'impl-matrix.json']
+
+
+def test_results(row):
+    """Return the uri of an impl row's test results, or None if it has none or they are MISSING."""
+    m = rfcs.get_test_results_link(row)
+    if m is None or 'MISSING' in m.group(1).upper():
+        return None
+    return m.group(2).strip()
+
+
+def matrix(catalog):
+    """
+    Return [{'name', 'spellings', 'rfcs': [{'num', 'title', 'status', 'relpath', 'link',
+    'test_results'}, ...]}, ...] sorted by impl name, each impl's RFCs sorted by number.
+    """
+    by_relpath = {rfc.relpath: rfc for rfc in catalog.all}
+    registry = impls.Registry.from_rfcs(catalog.all)
+    out = []
+    for refs in registry.by_name.values():
+        spellings = collections.Counter(x.name for x in refs)
+        supported = []
+        for ref in sorted(refs, key=lambda x: (by_relpath[x.relpath].num, x.row_num)):
+            rfc = by_relpath[ref.relpath]
+            supported.append({'num': rfc.num, 'title': rfc.title, 'status': rfc.status, 'relpath': rfc.relpath,
+                              'link': ref.link, 'test_results': test_results(rfc.impl_table[ref.row_num - 1])})
+        out.append({'name': spellings.most_common(1)[0][0], 'spellings': sorted(spellings), 'rfcs': supported})
+    return sorted(out, key=lambda x: x['name'].lower())
+
+
+def render_md(impl_list):
+    out = ['# Aries RFCs by Implementation\n']
+    for impl in impl_list:
+        out.append('\n## %s\n\nRFC | Status | Test Results\n--- | --- | ---\n' % impl['name'])
+        for x in impl['rfcs']:
+            results = '[test results](%s)' % x['test_results'] if x['test_results'] else ''
+            out.append('[%s: %s](/%s) | %s | %s\n' % (x['num'], x['title'], x['relpath'], x['status'], results))
+    out.append('\n\n>(This file is machine-generated; see [code/generate_impl_matrix.py](code/generate_impl_matrix.py).)\n')
+    return ''.join(out)
+
+
+def render_csv(impl_list):
+    """One row per RFC that has impls; each impl column holds its test results uri, 'yes', or nothing."""
+    columns = [x['name'] for x in impl_list]
+    rows = {}
+    for impl in impl_list:
+        for x in impl['rfcs']:
+            row = rows.setdefault(x['num'], {'RFC': x['num'], 'Title': x['title'], 'Status': x['status']})
+            row[impl['name']] = x['test_results'] or row.get(impl['name']) or 'yes'
+    f = io.StringIO()
+    writer = csv.DictWriter(f, ['RFC', 'Title', 'Status'] + columns, lineterminator='\n')
+    writer.writeheader()
+    for num in sorted(rows):
+        writer.writerow(rows[num])
+    return f.getvalue()
+
+
+def render(catalog):
+    """Return {file name: text} for the three outputs."""
+    impl_list = matrix(catalog)
+    return {
+        'impl-matrix.md': render_md(impl_list),
+        'impl-matrix.csv': render_csv(impl_list),
+        'impl-matrix.json': json.dumps(impl_list, indent=2) + '\n',
+    }
+
+
+def write(out_folder, catalog):
+    """Write the outputs that changed into out_folder; return {file name: write_if_changed result}."""
+    os.makedirs(out_folder, exist_ok=True)
+    return {name: rfcs.write_if_changed(os.path.join(out_folder, name), txt) for name, txt in render(catalog).items()}
+
+
+def main(out_folder, workers = None):
+    catalog = rfcs.catalog(rfcs.walk(workers=workers))
+    for name, result in write(out_folder, catalog).items():
+        fname = os.path.join(out_folder, name)
+        print('%s %s.' % (result, fname) if result else 'No change to %s.' % fname)
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser('Generate the implementation x RFC matrix')
+    ap.add_argument('out_folder', metavar='FOLDER', help='where to write impl-matrix.md, .csv and .json')
+    ap.add_argument('--workers', '-j', type=int, default=None, help='parse RFCs across this many processes')
+    args = ap.parse_args()
+    main(args.out_folder, args.workers)
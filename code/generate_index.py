@@ -1,58 +1,49 @@
 import argparse
-from operator import itemgetter
 import os
-from pathlib import Path
 import sys
 
 import rfcs
 
 
-def update(fname, tmp_fname):
-    if not os.path.exists(fname):
-        os.rename(tmp_fname, fname)
-        print('Generated %s.' % fname)
-        return
-    with open(fname, encoding='utf-8', mode='rt') as f:
-        old = f.read()
-    with open(tmp_fname, encoding='utf-8', mode='rt') as f:
-        new = f.read()
-    if old == new:
-        print('No change to %s.' % fname)
-        return
-    os.remove(fname)
-    os.rename(tmp_fname, fname)
-    print('Updated %s.' % fname)
+def render(catalog):
+    """Return the text of index.md for an rfcs.catalog()."""
+    out = ["# Aries RFCs by Status\n"]
+    for status in rfcs.status_list:
+        out.append(f"\n## [{status}](README.md#{status.lower()})\n")
+        for rfc in catalog.by_status[status]:
+            line = f"* [{rfc.num}: {rfc.title}]({rfc.relpath})"
+            tags = [f"[`{x}`](/tags.md#{x})" for x in rfc.tags]
+            line += f" ({rfc.since}"
+            if rfc.impl_count:
+                line += f", [{rfc.impl_count} impl"
+                if rfc.impl_count > 1:
+                    line += 's'
+                line += '](' + rfc.relpath + '#implementations)'
+            line += ' &mdash; ' + ' '.join(tags) + ')'
+            out.append(line + '\n')
+    out.append("\n\n>(This file is machine-generated; see [code/generate_index.py](code/generate_index.py).)\n")
+    return ''.join(out)
 
 
-def main(fname = None):
+def main(fname = None, workers = None, check = False):
+    """Regenerate index.md, or with check, just return whether it is current."""
     if not fname:
         fname = os.path.join(rfcs.root_folder, 'index.md')
-    # Load all metadata
-    all = [rfc for rfc in rfcs.walk()]
-    all.sort(key=lambda x: x.num)
-    tmp_fname = fname + '.tmp'
-    with open(tmp_fname, 'w', encoding='utf-8') as out:
-        out.write("# Aries RFCs by Status\n")
-        for status in rfcs.status_list:
-            out.write(f"\n## [{status}](README.md#{status.lower()})\n")
-            with_status = [rfc for rfc in all if rfc.status == status]
-            for rfc in with_status:
-                line = f"* [{rfc.num}: {rfc.title}]({rfc.relpath})"
-                tags = [f"[`{x}`](/tags.md#{x})" for x in rfc.tags]
-                line += f" ({rfc.since}"
-                if rfc.impl_count:
-                    line += f", [{rfc.impl_count} impl"
-                    if rfc.impl_count > 1:
-                        line += 's'
-                    line += '](' + rfc.relpath + '#implementations)'
-                line += ' &mdash; ' + ' '.join(tags) + ')'
-                out.write(line + '\n')
-        out.write("\n\n>(This file is machine-generated; see [code/generate_index.py](code/generate_index.py).)\n")
-    update(fname, tmp_fname)
+    catalog = rfcs.catalog(rfcs.walk(workers=workers))
+    result = rfcs.write_if_changed(fname, render(catalog), check)
+    if check:
+        if result:
+            print('%s is out of date. Run python code/generate_all.py.' % fname)
+    else:
+        print('%s %s.' % (result, fname) if result else 'No change to %s.' % fname)
+    return not (check and result)
 
 
 if __name__ == '__main__':
     ap = argparse.ArgumentParser('Genrate index')
     ap.add_argument('altpath', metavar='PATH', nargs='?', default=None, help='override where index is generated')
+    ap.add_argument('--workers', '-j', type=int, default=None, help='parse RFCs across this many processes')
+    ap.add_argument('--check', action='store_true', help="don't write; exit 1 if the index is out of date")
     args = ap.parse_args()
-    main(args.altpath)
+    if not main(args.altpath, args.workers, args.check):
+        sys.exit(1)
@@ -0,0 +1,45 @@
+import argparse
+import os
+import sys
+
+import rfcs
+
+# tags.md is written by hand down to this line; everything after it is generated.
+MARKER = '<!-- The list of RFCs by tag below is machine-generated; see code/generate_all.py. -->'
+
+
+def hand_written(txt):
+    """Return the part of tags.md above the generated list."""
+    i = txt.find(MARKER)
+    return (txt if i == -1 else txt[:i]).rstrip('\n') + '\n'
+
+
+def render(catalog, txt):
+    """Return tags.md with the generated list rebuilt for an rfcs.catalog(); txt is the current page."""
+    out = [hand_written(txt), '\n', MARKER, '\n## RFCs by Tag\n\n']
+    for tag in sorted(catalog.by_tag):
+        links = [f"[{rfc.num}]({rfc.relpath})" for rfc in catalog.by_tag[tag]]
+        out.append(f"* `{tag}`: " + ', '.join(links) + '\n')
+    return ''.join(out)
+
+
+def main(fname = None, workers = None, check = False):
+    if not fname:
+        fname = os.path.join(rfcs.root_folder, 'tags.md')
+    with open(os.path.join(rfcs.root_folder, 'tags.md'), 'rt', encoding='utf-8') as f:
+        txt = f.read()
+    catalog = rfcs.catalog(rfcs.walk(workers=workers))
+    result = rfcs.write_if_changed(fname, render(catalog, txt), check)
+    if check and result:
+        print('%s is out of date. Run python code/generate_all.py.' % fname)
+    return not (check and result)
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser('Generate the list of RFCs by tag in tags.md')
+    ap.add_argument('altpath', metavar='PATH', nargs='?', default=None, help='override where tags.md is generated')
+    ap.add_argument('--workers', '-j', type=int, default=None, help='parse RFCs across this many processes')
+    ap.add_argument('--check', action='store_true', help="don't write; exit 1 if tags.md is out of date")
+    args = ap.parse_args()
+    if not main(args.altpath, args.workers, args.check):
+        sys.exit(1)
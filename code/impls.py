@@ -0,0 +1,90 @@
+"""
+Every implementation that the RFCs' impl tables link to, indexed by normalized name
+and by site in one pass over the rows. Inconsistencies (one impl spelled several
+ways, one site under several names, one name at several sites) then fall out of
+the indexes directly, without searching the rows again for each offender.
+"""
+import collections
+import sys
+
+import rfcs
+
+# One hyperlinked row of an impl table
+Ref = collections.namedtuple('Ref', 'relpath row_num name link norm_name base_uri')
+
+
+def _distinct(values):
+    return list(dict.fromkeys(values))
+
+
+class Registry:
+
+    def __init__(self):
+        self.refs = []
+        self.by_name = {}
+        self.by_base = {}
+
+    def add(self, relpath, row_num, name, link):
+        ref = Ref(relpath, row_num, name, link, rfcs.normalize_impl_name(name), rfcs.get_impl_base(link))
+        self.refs.append(ref)
+        self.by_name.setdefault(ref.norm_name, []).append(ref)
+        self.by_base.setdefault(ref.base_uri, []).append(ref)
+        return ref
+
+    @classmethod
+    def from_rfcs(cls, found):
+        registry = cls()
+        for rfc in sorted(found, key=lambda x: x.relpath):
+            for n, row in enumerate(rfc.impl_table or [], 1):
+                if len(row) == 2 and row[0].startswith('['):
+                    name, link = rfcs.split_hyperlink(row[0])
+                    if name and link:
+                        registry.add(rfc.relpath, n, name, link)
+        return registry
+
+    def name_variants(self):
+        """Yield (normalized name, [spellings], [refs]) for impls spelled more than one way."""
+        for key, refs in self.by_name.items():
+            names = _distinct(x.name for x in refs)
+            if len(names) > 1:
+                yield key, names, refs
+
+    def sites_with_many_names(self):
+        """Yield (base uri, [normalized names], [refs]) for sites listed under more than one impl name."""
+        for key, refs in self.by_base.items():
+            names = _distinct(x.norm_name for x in refs)
+            if len(names) > 1:
+                yield key, names, refs
+
+    def names_with_many_sites(self):
+        """Yield (normalized name, [base uris], [refs]) for impl names that link to more than one site."""
+        for key, refs in self.by_name.items():
+            sites = _distinct(x.base_uri for x in refs)
+            if len(sites) > 1:
+                yield key, sites, refs
+
+    def problems(self):
+        """Yield a message for each inconsistency, naming every impl row involved."""
+        def where(refs):
+            return '\n'.join('%s, impl row %d' % (x.relpath.replace('/README.md', ''), x.row_num) for x in refs)
+
+        def quoted(values):
+            return ', '.join('"%s"' % v for v in values)
+
+        for key, names, refs in self.name_variants():
+            yield '%s:\n  inconsistent variants on impl name: %s' % (where(refs), quoted(names))
+        for key, names, refs in self.sites_with_many_names():
+            yield '%s:\n  same site maps to multiple impl names: %s' % (where(refs), quoted(names))
+        for key, sites, refs in self.names_with_many_sites():
+            yield '%s:\n  impl name "%s" maps to multiple sites: %s' % (where(refs), key, quoted(sites))
+
+
+def main():
+    problems = list(Registry.from_rfcs(rfcs.walk()).problems())
+    for msg in problems:
+        print(msg)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+import argparse
+import collections
+import json
+import os
+import re
+import sys
+
+# An RFC's own page, as opposed to the other .md files that live beside it.
+RFC_README_PAT = re.compile(r'^(?:concepts|features)/\d{4}-[^/]+/README\.md$')
+
+Edge = collections.namedtuple('Edge', 'src dst uri error')
+
+
+def node_kind(node):
+    """Nodes are files (repo-relative paths), anchors (file#fragment) or web hosts (scheme://host)."""
+    if '://' in node:
+        return 'host'
+    if '#' in node:
+        return 'anchor'
+    return 'file'
+
+
+def node_file(node):
+    """The file a file or anchor node lives in, or None for a host."""
+    if '://' in node:
+        return None
+    i = node.find('#')
+    return node[:i] if i > -1 else node
+
+
+class LinkGraph:
+    """
+    Every link found in the files checked, as {source file: [Edge, ...]}. Files are
+    paths relative to the repo root, with / separators. The reverse direction, from a
+    file to the files that link into it, is built on demand.
+    """
+
+    def __init__(self, edges=None):
+        self.edges = edges if edges is not None else {}
+        self._reverse = None
+
+    def set_edges(self, src, edges):
+        """Replace every link out of src."""
+        self.edges[src] = list(edges)
+        self._reverse = None
+
+    def remove(self, src):
+        self.edges.pop(src, None)
+        self._reverse = None
+
+    def all_edges(self):
+        for src in sorted(self.edges):
+            yield from self.edges[src]
+
+    def reverse(self):
+        if self._reverse is None:
+            self._reverse = {}
+            for edge in self.all_edges():
+                target = node_file(edge.dst)
+                if target is not None:
+                    self._reverse.setdefault(target, set()).add(edge.src)
+        return self._reverse
+
+    def linkers_of(self, paths):
+        """Return the set of files that link to any of paths."""
+        reverse = self.reverse()
+        found = set()
+        for path in paths:
+            found |= reverse.get(path, set())
+        return found
+
+    def nodes(self):
+        """Return {node: kind} for every file, anchor and host in the graph."""
+        nodes = {}
+        for src in self.edges:
+            nodes[src] = 'file'
+        for edge in self.all_edges():
+            nodes[edge.dst] = node_kind(edge.dst)
+            target = node_file(edge.dst)
+            if target is not None and target not in nodes:
+                nodes[target] = 'file'
+        return nodes
+
+    def in_degree(self):
+        """Count links into each file or host from other files. Links to anchors count for their file."""
+        counts = collections.Counter()
+        for edge in self.all_edges():
+            target = node_file(edge.dst) or edge.dst
+            if target != edge.src:
+                counts[target] += 1
+        return counts
+
+    def orphans(self):
+        """List the RFCs in the graph that no other file links to."""
+        counts = self.in_degree()
+        return sorted(x for x in self.nodes() if RFC_README_PAT.match(x) and not counts[x])
+
+    def broken(self):
+        """List the edges whose link failed its check."""
+        return [edge for edge in self.all_edges() if edge.error]
+
+    @staticmethod
+    def load(fname):
+        """Return the graph saved in fname, or None if there isn't a usable one."""
+        try:
+            with open(fname, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+            return LinkGraph({src: [Edge(src, *x) for x in edges] for src, edges in data['edges'].items()})
+        except (OSError, ValueError, KeyError, AttributeError, TypeError):
+            return None
+
+    def save(self, fname):
+        os.makedirs(os.path.dirname(fname), exist_ok=True)
+        tmp_fname = fname + '.tmp'
+        with open(tmp_fname, 'wt', encoding='utf-8') as f:
+            json.dump({'edges': {src: [x[1:] for x in edges] for src, edges in sorted(self.edges.items())}}, f)
+        os.replace(tmp_fname, fname)
+
+    def export_jsonl(self, fname):
+        """Write one JSON record per node, then one per edge."""
+        with open(fname, 'wt', encoding='utf-8') as f:
+            for node, kind in sorted(self.nodes().items()):
+                f.write(json.dumps({'type': 'node', 'id': node, 'kind': kind}) + '\n')
+            for edge in self.all_edges():
+                f.write(json.dumps({'type': 'edge', 'src': edge.src, 'dst': edge.dst,
+                                    'uri': edge.uri, 'error': edge.error}) + '\n')
+
+    @staticmethod
+    def load_jsonl(fname):
+        graph = LinkGraph()
+        with open(fname, 'rt', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                if record['type'] == 'node' and record['kind'] == 'file':
+                    graph.edges.setdefault(record['id'], [])
+                elif record['type'] == 'edge':
+                    graph.edges.setdefault(record['src'], []).append(
+                        Edge(record['src'], record['dst'], record['uri'], record['error']))
+        return graph
+
+
+def main(argv):
+    ap = argparse.ArgumentParser('Query a link graph exported by check_links.py --graph')
+    ap.add_argument('graph', metavar='FILE', help='JSON Lines file written by check_links.py --graph')
+    ap.add_argument('query', choices=['indegree', 'orphans', 'broken'])
+    ap.add_argument('--top', type=int, default=20, help='how many nodes indegree lists')
+    args = ap.parse_args(argv)
+    graph = LinkGraph.load_jsonl(args.graph)
+    if args.query == 'indegree':
+        for node, count in graph.in_degree().most_common(args.top):
+            print('%6d %s' % (count, node))
+    elif args.query == 'orphans':
+        for node in graph.orphans():
+            print(node)
+    else:
+        for edge in graph.broken():
+            print('%s: [%s] %s' % (edge.src, edge.uri, edge.error.strip().splitlines()[-1]))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,29 +1,77 @@
-import sys
+"""
+Turn the plain tags on RFCs' Tags lines into links to tags.md. With no file names,
+every RFC in the repo is processed; only files whose Tags line needs linking are
+rewritten.
+"""
+import argparse
+import concurrent.futures
+import difflib
+import os
 import re
+import sys
 
-tag_line_pat = re.compile(r'^\s*-\s*[Tt]ags\s*:\s*(.*?)$', re.M)
+import rfcs
 
-def link_tags(fname):
-    changed = False
-    with open(fname, 'rt') as f:
-        txt = f.read()
+tag_line_pat = re.compile(r'^\s*-\s*[Tt]ags\s*:\s*(.*?)\r?$', re.M)
+
+WORKERS = 8
+
+
+def linked_tags(txt):
+    """Return txt with its Tags line linked, or None if there is nothing to link."""
     m = tag_line_pat.search(txt)
     if m:
-        update = False
+        changed = False
         tags = [t.strip() for t in m.group(1).split(',')]
         for i in range(len(tags)):
             tag = tags[i]
-            if tag[0] != '[':
+            if tag and tag[0] != '[':
                 changed = True
                 tags[i] = '[' + tag + '](/tags.md#' + tag + ')'
         if changed:
             tags = ', '.join(tags)
-            txt = txt[:m.start(1)] + tags + txt[m.end(1):]
-            with open(fname, 'wt') as f:
-                f.write(txt)
+            return txt[:m.start(1)] + tags + txt[m.end(1):]
+
+
+def link_tags(fname, dry_run=False):
+    """
+    Link the tags in fname, replacing the file atomically. Return (fname, old text,
+    new text) if it needed linking, else None. With dry_run, nothing is written.
+    """
+    # newline='' keeps whatever line endings the file already has.
+    with open(fname, 'rt', encoding='utf-8', newline='') as f:
+        txt = f.read()
+    new = linked_tags(txt)
+    if new is None:
+        return None
+    if not dry_run:
+        tmp_fname = '%s.%d.tmp' % (fname, os.getpid())
+        with open(tmp_fname, 'wt', encoding='utf-8', newline='') as f:
+            f.write(new)
+        os.replace(tmp_fname, fname)
+    return fname, txt, new
+
+
+def main(fnames=None, dry_run=False, workers=WORKERS):
+    """Link tags in fnames (default: every RFC); return how many files needed it."""
+    if not fnames:
+        fnames = list(rfcs.walk_files())
+    with concurrent.futures.ThreadPoolExecutor(max(1, workers)) as pool:
+        results = [x for x in pool.map(lambda fname: link_tags(fname, dry_run), fnames) if x]
+    for fname, old, new in results:
+        if dry_run:
+            sys.stdout.writelines(difflib.unified_diff(
+                old.splitlines(True), new.splitlines(True), fname, fname + ' (tags linked)'))
+        else:
             print('Updated ' + fname)
+    print('%d of %d files %s.' % (len(results), len(fnames), 'would change' if dry_run else 'updated'))
+    return len(results)
 
 
 if __name__ == '__main__':
-    for fname in sys.argv[1:]:
-        link_tags(fname)
+    ap = argparse.ArgumentParser('Link the tags on RFCs to tags.md')
+    ap.add_argument('fnames', metavar='FILE', nargs='*', help='files to process (default: every RFC)')
+    ap.add_argument('--dry-run', '-n', action='store_true', help='show a diff of what would change; write nothing')
+    ap.add_argument('--workers', '-j', type=int, default=WORKERS, help='how many files to process at once')
+    args = ap.parse_args()
+    main(args.fnames, args.dry_run, args.workers)
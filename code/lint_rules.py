@@ -0,0 +1,264 @@
+"""
+The rules every RFC's metadata must follow. Each rule is registered with @rule and
+names the RFC fields it reads; the linter hands it just those values, building each
+field (or derived value) at most once per RFC, and runs every rule in one pass over
+each RFC. Results can be printed, or written as JSON or SARIF for code scanning.
+"""
+import argparse
+import collections
+import json
+import re
+import sys
+import time
+
+import rfcs
+
+Rule = collections.namedtuple('Rule', 'name fields level description check')
+Finding = collections.namedtuple('Finding', 'rule level relpath message')
+
+RULES = {}
+
+# Values that several rules need, computed from an RFC once and asked for by name like fields.
+DERIVED = {
+    'test_suite_impls': lambda rfc: list(rfcs.test_suite_impls(rfc, True)),
+    'other_impls': lambda rfc: list(rfcs.test_suite_impls(rfc, False)),
+}
+
+_num_pat = re.compile(r'\d{4}$')
+_date_pat = re.compile(r'\d{4}-\d{2}-\d{2}')
+_email_link_pat = re.compile(r'\[.*?\]\([^)]+@.*?\)')
+_hyperlink_pat = re.compile(r'\[.*?\]\(.*?\)')
+
+
+def rule(name, *fields, level='error'):
+    """
+    Register a check that takes the named RFC fields and returns None, a message, or
+    an iterable of messages; a message may be a (level, text) pair to override level.
+    """
+    def register(check):
+        for field in fields:
+            if field not in rfcs.RFC._fields and field not in DERIVED:
+                raise ValueError('rule %s wants unknown field %s' % (name, field))
+        if name in RULES:
+            raise ValueError('rule %s is registered twice' % name)
+        RULES[name] = Rule(name, fields, level, (check.__doc__ or '').strip(), check)
+        return check
+    return register
+
+
+@rule('title', 'title')
+def _title(title):
+    """The RFC has a title."""
+    if not title:
+        return 'no title found'
+
+
+@rule('category-path', 'category', 'relpath')
+def _category_path(category, relpath):
+    """The RFC lives under the folder for its category."""
+    if category not in relpath:
+        return 'category does not match path'
+
+
+@rule('category-tag', 'category', 'tags')
+def _category_tag(category, tags):
+    """The RFC is tagged with its own category and not the other one."""
+    if category[:-1] not in tags:
+        yield 'category not in tags'
+    opposite_category = 'feature' if category == 'concepts' else 'concept'
+    if opposite_category in tags:
+        yield 'opposite category in tags'
+
+
+@rule('status', 'status')
+def _status(status):
+    """The status is one of rfcs.status_list."""
+    if status not in rfcs.status_list:
+        return 'status is not canonical'
+
+
+@rule('num', 'num')
+def _num(num):
+    """The RFC number has 4 digits."""
+    if not _num_pat.match(num):
+        return 'num is not 4 digits'
+
+
+@rule('dates', 'since', 'start_date')
+def _dates(since, start_date):
+    """Since, and Start Date if given, contain a yyyy-mm-dd date."""
+    if not _date_pat.search(since):
+        yield 'since does not contain yyyy-mm-dd'
+    if start_date and not _date_pat.search(start_date):
+        yield 'start_date does not contain yyyy-mm-dd'
+
+
+@rule('authors', 'authors')
+def _authors(authors):
+    """There are authors, and any email address among them is a link."""
+    if not authors:
+        return 'no authors found'
+    if '@' in authors and not _email_link_pat.search(authors):
+        return 'email is not clickable'
+
+
+@rule('tags-lowercase', 'tags')
+def _tags_lowercase(tags):
+    """Tags are all lowercase."""
+    if ','.join(tags) != ','.join(tags).lower():
+        return 'tags are case-sensitive'
+
+
+@rule('supersedes-links', 'supersedes', 'superseded_by')
+def _supersedes_links(supersedes, superseded_by):
+    """Supersedes and Superseded By, if given, link to what they name."""
+    if supersedes and not _hyperlink_pat.search(supersedes):
+        yield 'supersedes does not contain hyperlink'
+    if superseded_by and not _hyperlink_pat.search(superseded_by):
+        yield 'superseded_by does not contain hyperlink'
+
+
+def _tested(status, tags):
+    # Whether an RFC must show test results: protocols and decorators beyond DEMONSTRATED.
+    return status in ['ACCEPTED', 'ADOPTED'] and 'feature' in tags and ('protocol' in tags or 'decorator' in tags)
+
+
+@rule('proposed-impls', 'status', 'other_impls')
+def _proposed_impls(status, other_impls):
+    """A PROPOSED RFC has no implementations other than test suites."""
+    if status == 'PROPOSED' and other_impls:
+        return 'should not be PROPOSED if it has a non-test-suite impl'
+
+
+@rule('test-suite-impl', 'status', 'tags', 'test_suite_impls')
+def _test_suite_impl(status, tags, test_suite_impls):
+    """A protocol or decorator RFC beyond DEMONSTRATED lists a test suite among its impls."""
+    if _tested(status, tags) and not test_suite_impls:
+        msg = 'Test suite must be an impl for any protocol- or decorator-related RFC beyond DEMONSTRATED status.'
+        if 'test-anomaly' in tags:
+            return 'warning', msg
+        return msg + ' Tag "test-anomaly" to temporarily override.'
+
+
+@rule('test-results-links', 'status', 'tags', 'other_impls')
+def _test_results_links(status, tags, other_impls):
+    """Each impl of a protocol or decorator RFC beyond DEMONSTRATED links to its test results."""
+    if not _tested(status, tags):
+        return
+    for row in other_impls:
+        m = rfcs.get_test_results_link(row)
+        # If we lack a link entirely, this is an error, period.
+        # If we have tagged the RFC with "test-anomaly", then it becomes possible to link
+        # the ugly text "MISSING test results" to the test-anomaly tag and have the result
+        # be only a warning. This ugly text+link should only be accepted when the 'test-anomaly'
+        # tag is present.
+        desc = rfcs.describe_impl_row(row)
+        if m is None:
+            yield 'Impl "%s" needs a link to test results in its Notes column. Format = [test results](...) or, if RFC is tagged "test-anomaly", [MISSING test results](/tags.md#test-anomaly).' % desc
+        # Are test results explicitly declared to be missing?
+        elif 'MISSING' in m.group(1) and '/tags.md#test-anomaly' in m.group(2):
+            if 'test-anomaly' in tags:
+                yield 'warning', 'Impl "%s" needs to replace missing test results with something meaningful.' % desc
+            else:
+                yield 'Can\'t declare missing tests without the "test-anomaly" tag to make the RFC ugly, so impl "%s" needs a link to test results in its Notes column. Format = [test results](...).' % desc
+
+
+class Linter:
+    """Runs a set of rules (default: all of them) over RFCs, optionally timing each rule."""
+
+    def __init__(self, names=None, timing=False):
+        unknown = set(names or []) - set(RULES)
+        if unknown:
+            raise ValueError('no such rule: ' + ', '.join(sorted(unknown)))
+        self.rules = [RULES[x] for x in names] if names else list(RULES.values())
+        self.timings = collections.Counter() if timing else None
+
+    def lint(self, rfc):
+        """Return the Findings for one RFC."""
+        values = {}
+        findings = []
+        for r in self.rules:
+            if self.timings is not None:
+                start = time.perf_counter()
+            args = []
+            for field in r.fields:
+                if field not in values:
+                    values[field] = DERIVED[field](rfc) if field in DERIVED else getattr(rfc, field)
+                args.append(values[field])
+            results = r.check(*args)
+            if isinstance(results, (str, tuple)):
+                results = [results]
+            for result in results or []:
+                level, msg = result if isinstance(result, tuple) else (r.level, result)
+                findings.append(Finding(r.name, level, rfc.relpath, msg))
+            if self.timings is not None:
+                self.timings[r.name] += time.perf_counter() - start
+        return findings
+
+    def lint_all(self, found):
+        findings = []
+        for rfc in found:
+            findings += self.lint(rfc)
+        return findings
+
+
+def to_json(findings, timings=None):
+    out = {'findings': [f._asdict() for f in findings]}
+    if timings is not None:
+        out['timings'] = dict(timings)
+    return out
+
+
+def to_sarif(findings, rules, timings=None):
+    run = {
+        'tool': {'driver': {
+            'name': 'aries-rfcs-lint',
+            'rules': [{'id': r.name, 'shortDescription': {'text': r.description},
+                       'defaultConfiguration': {'level': r.level}} for r in rules],
+        }},
+        'results': [{
+            'ruleId': f.rule,
+            'level': f.level,
+            'message': {'text': f.message},
+            'locations': [{'physicalLocation': {'artifactLocation': {'uri': f.relpath}}}],
+        } for f in findings],
+    }
+    if timings is not None:
+        run['properties'] = {'timings': dict(timings)}
+    return {'version': '2.1.0', '$schema': 'https://json.schemastore.org/sarif-2.1.0.json', 'runs': [run]}
+
+
+def main(argv):
+    ap = argparse.ArgumentParser('Check RFC metadata against the lint rules')
+    ap.add_argument('--format', choices=['text', 'json', 'sarif'], default='text')
+    ap.add_argument('--rule', action='append', metavar='NAME', help='run only this rule (repeatable)')
+    ap.add_argument('--timing', action='store_true', help='report how long each rule took in total')
+    ap.add_argument('--output', '-o', metavar='FILE', help='write results here instead of stdout')
+    ap.add_argument('--list', action='store_true', help='list the rules and the fields they read')
+    args = ap.parse_args(argv)
+    if args.list:
+        for r in RULES.values():
+            print('%-20s %-7s %s (%s)' % (r.name, r.level, r.description, ', '.join(r.fields)))
+        return 0
+    linter = Linter(args.rule, args.timing)
+    findings = linter.lint_all(rfcs.walk())
+    out = open(args.output, 'wt', encoding='utf-8') if args.output else sys.stdout
+    try:
+        if args.format == 'json':
+            json.dump(to_json(findings, linter.timings), out, indent=2)
+        elif args.format == 'sarif':
+            json.dump(to_sarif(findings, linter.rules, linter.timings), out, indent=2)
+        else:
+            for f in findings:
+                out.write('%s: %s: %s [%s]\n' % (f.relpath.replace('/README.md', ''), f.level, f.message, f.rule))
+            if linter.timings is not None:
+                for name, elapsed in linter.timings.most_common():
+                    out.write('%8.2f ms %s\n' % (elapsed * 1000, name))
+    finally:
+        if args.output:
+            out.close()
+    return 1 if any(f.level == 'error' for f in findings) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
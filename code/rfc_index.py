@@ -0,0 +1,179 @@
+"""
+Keep the metadata that rfcs.walk() finds in an indexed SQLite file, so questions like
+"ACCEPTED protocol RFCs with no test suite impl" don't need a full parse of the corpus.
+The index is refreshed from file mtimes: only RFCs whose README.md changed are parsed.
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+
+import rfcs
+
+# Bump when the tables below change shape; edits to this file or rfcs.py rebuild the index too.
+SCHEMA_VERSION = 1
+
+SCHEMA = '''
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE rfcs (
+    relpath TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER,
+    num TEXT, title TEXT, category TEXT, folder TEXT, status TEXT, since TEXT, status_note TEXT,
+    start_date TEXT, authors TEXT, supersedes TEXT, superseded_by TEXT, impl_count INTEGER);
+CREATE INDEX rfcs_num ON rfcs (num);
+CREATE INDEX rfcs_status ON rfcs (status, since);
+CREATE TABLE tags (relpath TEXT, tag TEXT);
+CREATE INDEX tags_tag ON tags (tag, relpath);
+CREATE INDEX tags_relpath ON tags (relpath);
+CREATE TABLE impls (relpath TEXT, row_num INTEGER, name TEXT, link TEXT, notes TEXT, test_suite INTEGER);
+CREATE INDEX impls_relpath ON impls (relpath, test_suite);
+CREATE INDEX impls_name ON impls (name);
+CREATE TABLE supersedes (relpath TEXT, direction TEXT, num TEXT, uri TEXT);
+CREATE INDEX supersedes_relpath ON supersedes (relpath);
+CREATE INDEX supersedes_num ON supersedes (num);
+'''
+
+
+def default_db_file():
+    return os.path.join(rfcs.root_folder, '.cache', 'rfcs.sqlite')
+
+
+def _version():
+    """Changes whenever the parser or the way rows are derived from it changes."""
+    with open(__file__, 'rb') as f:
+        return rfcs.parser_version() + hashlib.sha1(f.read()).hexdigest()
+
+
+def _create(db):
+    for table in ['meta', 'rfcs', 'tags', 'impls', 'supersedes']:
+        db.execute('DROP TABLE IF EXISTS ' + table)
+    db.executescript(SCHEMA)
+    db.execute('INSERT INTO meta VALUES (?, ?)', ('version', _version()))
+    db.execute('PRAGMA user_version = %d' % SCHEMA_VERSION)
+
+
+def _delete(db, relpath):
+    for table in ['rfcs', 'tags', 'impls', 'supersedes']:
+        db.execute('DELETE FROM %s WHERE relpath = ?' % table, (relpath,))
+
+
+def _insert(db, rfc, st):
+    db.execute('INSERT INTO rfcs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', (
+        rfc.relpath, st.st_mtime_ns, st.st_size, rfc.num, rfc.title, rfc.category, rfc.folder, rfc.status,
+        rfc.since, rfc.status_note, rfc.start_date, rfc.authors, rfc.supersedes, rfc.superseded_by,
+        rfc.impl_count))
+    db.executemany('INSERT INTO tags VALUES (?, ?)', [(rfc.relpath, tag) for tag in rfc.tags if tag])
+    db.executemany('INSERT INTO impls VALUES (?, ?, ?, ?, ?, ?)', [
+        (rfc.relpath, n, row.name, row.link, row.notes, int(rfcs.is_test_suite(row)))
+        for n, row in enumerate(rfc.impl_table or [], 1)])
+    for direction in ['supersedes', 'superseded_by']:
+        db.executemany('INSERT INTO supersedes VALUES (?, ?, ?, ?)', [
+            (rfc.relpath, direction, num, uri) for num, uri in rfcs.supersedes_links(getattr(rfc, direction))])
+
+
+def refresh(db):
+    """
+    Bring the index up to date with the RFCs on disk, parsing only those whose
+    README.md mtime or size changed. Return (updated, removed) counts.
+    """
+    current = db.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+    if current:
+        row = db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        current = row is not None and row[0] == _version()
+    with db:
+        if not current:
+            _create(db)
+        known = {row[0]: (row[1], row[2]) for row in db.execute('SELECT relpath, mtime_ns, size FROM rfcs')}
+        updated = 0
+        for abspath in rfcs.walk_files():
+            relpath = rfcs.relpath(abspath)
+            st = os.stat(abspath)
+            if known.pop(relpath, None) != (st.st_mtime_ns, st.st_size):
+                _delete(db, relpath)
+                _insert(db, rfcs.read_rfc(abspath), st)
+                updated += 1
+        for relpath in known:
+            _delete(db, relpath)
+    return updated, len(known)
+
+
+def connect(fname=None, update=True):
+    """Open the index (default: .cache/rfcs.sqlite), refreshing it first unless update is False."""
+    fname = fname or default_db_file()
+    os.makedirs(os.path.dirname(os.path.abspath(fname)), exist_ok=True)
+    db = sqlite3.connect(fname)
+    db.row_factory = sqlite3.Row
+    if update:
+        refresh(db)
+    return db
+
+
+def query(db, sql, params=()):
+    return db.execute(sql, params).fetchall()
+
+
+def by_status(db, status):
+    return query(db, 'SELECT * FROM rfcs WHERE status = ? ORDER BY num', (status,))
+
+
+def by_tag(db, tag, since=None):
+    """RFCs carrying tag, optionally only those whose Since date is on or after since (yyyy-mm-dd)."""
+    sql = 'SELECT rfcs.* FROM tags JOIN rfcs USING (relpath) WHERE tag = ?'
+    params = [tag]
+    if since:
+        sql += ' AND rfcs.since >= ?'
+        params.append(since)
+    return query(db, sql + ' ORDER BY num', params)
+
+
+def without_test_suite(db, status='ACCEPTED', tag='protocol'):
+    """RFCs with status and tag that list no test suite among their impls."""
+    return query(db, '''
+        SELECT rfcs.* FROM tags JOIN rfcs USING (relpath)
+        WHERE tag = ? AND status = ?
+          AND NOT EXISTS (SELECT 1 FROM impls WHERE impls.relpath = rfcs.relpath AND test_suite)
+        ORDER BY num''', (tag, status))
+
+
+def _print_rows(rows):
+    for row in rows:
+        if 'num' in row.keys() and 'title' in row.keys():
+            print('%s %s (%s) %s' % (row['num'], row['title'], row['status'], row['relpath']))
+        else:
+            print(' | '.join('' if x is None else str(x) for x in row))
+
+
+def main(argv):
+    ap = argparse.ArgumentParser('Query an index of RFC metadata')
+    ap.add_argument('--db', metavar='FILE', help='where the index lives (default .cache/rfcs.sqlite)')
+    sub = ap.add_subparsers(dest='command')
+    # add_subparsers() only takes required= from Python 3.7
+    sub.required = True
+    sub.add_parser('build', help='bring the index up to date and say what changed')
+    p = sub.add_parser('status', help='list RFCs with a status')
+    p.add_argument('status')
+    p = sub.add_parser('tag', help='list RFCs with a tag')
+    p.add_argument('tag')
+    p.add_argument('--since', metavar='YYYY-MM-DD', help='only RFCs whose Since date is on or after this')
+    p = sub.add_parser('no-test-suite', help='list RFCs that lack a test suite impl')
+    p.add_argument('--status', default='ACCEPTED')
+    p.add_argument('--tag', default='protocol')
+    p = sub.add_parser('sql', help='run a query against the tables rfcs, tags, impls and supersedes')
+    p.add_argument('sql')
+    args = ap.parse_args(argv)
+    db = connect(args.db, update=False)
+    updated, removed = refresh(db)
+    if args.command == 'build':
+        print('Updated %d RFCs, removed %d.' % (updated, removed))
+    elif args.command == 'status':
+        _print_rows(by_status(db, args.status.upper()))
+    elif args.command == 'tag':
+        _print_rows(by_tag(db, args.tag, args.since))
+    elif args.command == 'no-test-suite':
+        _print_rows(without_test_suite(db, args.status.upper(), args.tag))
+    else:
+        _print_rows(query(db, args.sql))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,9 +1,148 @@
 import collections
+import concurrent.futures
+import functools
+import hashlib
+import json
 import os
 import re
+import time
 
-RFC = collections.namedtuple('RFC', 'title abspath relpath category folder num authors status since' +
-                             ' status_note start_date supersedes superseded_by tags content_idx impl_count impl_table')
+class _Unset:
+    # A marker for lazy fields not built yet, which survives pickling.
+    def __reduce__(self):
+        return '_unset'
+
+
+_unset = _Unset()
+
+
+class RFC:
+    """
+    The metadata of one RFC. It behaves like the namedtuple it replaced (fields by name
+    or index, iteration, _asdict, _replace), but it is slotted, and its heavy fields are
+    only built when first used: tags and author_list are parsed from the raw metadata
+    lines, and impl_table (with impl_count) from the text after the Implementations
+    header. Callers that only want num, title, status and relpath never pay for them.
+    """
+    _fields = ('title', 'abspath', 'relpath', 'category', 'folder', 'num', 'authors', 'status', 'since',
+               'status_note', 'start_date', 'supersedes', 'superseded_by', 'tags', 'content_idx',
+               'impl_count', 'impl_table')
+    _light_fields = _fields[:13] + ('content_idx',)
+    __slots__ = _light_fields + ('tags_src', 'impl_src', '_impl_rows', '_tags', '_impl_table', '_author_list')
+
+    def __init__(self, title, abspath, relpath, category, folder, num, authors, status, since,
+                 status_note, start_date, supersedes, superseded_by, tags, content_idx, impl_count=None,
+                 impl_table=None):
+        for name, value in zip(self._light_fields, (title, abspath, relpath, category, folder, num, authors,
+                                                    status, since, status_note, start_date, supersedes,
+                                                    superseded_by, content_idx)):
+            setattr(self, name, value)
+        # impl_count is derived from impl_table; it is only accepted so RFC(*rfc) works.
+        if impl_count is not None and impl_table is not _unset and impl_count != (len(impl_table) if impl_table else 0):
+            raise ValueError('impl_count is derived from impl_table and cannot be set on its own')
+        self.tags_src = self.impl_src = self._impl_rows = None
+        self._tags = tags
+        self._impl_table = impl_table
+        self._author_list = _unset
+
+    @classmethod
+    def lazy(cls, tags_src, impl_src, impl_rows=None, **light):
+        """
+        Build an RFC from its light fields, the raw value of its Tags line, and either
+        the text that follows its Implementations header or, from the walk cache, the
+        cells of its impl table rows (both None if it has no Implementations section).
+        Either way, the impl table is only built when it is first used.
+        """
+        x = cls(tags=_unset, impl_table=_unset, **light)
+        x.tags_src = tags_src
+        x.impl_src = impl_src
+        x._impl_rows = impl_rows
+        return x
+
+    @property
+    def tags(self):
+        if self._tags is _unset:
+            self._tags = [unlink_tag(x) for x in self.tags_src.split(',')]
+        return self._tags
+
+    @property
+    def impl_table(self):
+        if self._impl_table is _unset:
+            if self._impl_rows is not None:
+                self._impl_table = [ImplRow(r) for r in self._impl_rows]
+            else:
+                self._impl_table = _read_impl_table(self.impl_src, 0) if self.impl_src is not None else None
+            # The rest of the document isn't needed once the table has been read from it.
+            self.impl_src = self._impl_rows = None
+        return self._impl_table
+
+    @property
+    def impl_count(self):
+        return len(self.impl_table) if self.impl_table else 0
+
+    @property
+    def author_list(self):
+        """The authors as (name, uri) pairs; uri is None for authors given without a link."""
+        if self._author_list is _unset:
+            self._author_list = parse_authors(self.authors)
+        return self._author_list
+
+    def cache_state(self):
+        """
+        The fields, without abspath, from which lazy() can rebuild an RFC that parse_rfc()
+        built. An impl table not read yet is stored as just the lines it spans, and one
+        already read as the cells of its rows; neither builds it.
+        """
+        state = {name: getattr(self, name) for name in self._light_fields if name != 'abspath'}
+        state['tags_src'] = self.tags_src
+        state['impl_src'] = state['impl_rows'] = None
+        if self._impl_table is not _unset:
+            state['impl_rows'] = [list(row) for row in self._impl_table] if self._impl_table is not None else None
+        elif self._impl_rows is not None:
+            state['impl_rows'] = self._impl_rows
+        elif self.impl_src is not None:
+            state['impl_src'] = _impl_table_text(self.impl_src)
+        return state
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __getitem__(self, i):
+        # Only the fields asked for are built, so rfc[0] doesn't parse the impl table.
+        if isinstance(i, slice):
+            return tuple(getattr(self, name) for name in self._fields[i])
+        return getattr(self, self._fields[i])
+
+    def __eq__(self, other):
+        if isinstance(other, (RFC, tuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'RFC(%s)' % ', '.join('%s=%r' % (name, getattr(self, name)) for name in self._fields)
+
+    def __reduce__(self):
+        return _rebuild_rfc, tuple(getattr(self, name) for name in self.__slots__)
+
+    def _asdict(self):
+        return {name: getattr(self, name) for name in self._fields}
+
+    def _replace(self, **changes):
+        fields = self._asdict()
+        fields.update(changes)
+        return RFC(**fields)
+
+
+def _rebuild_rfc(*values):
+    x = RFC.__new__(RFC)
+    for name, value in zip(RFC.__slots__, values):
+        setattr(x, name, value)
+    return x
 
 
 status_list = ["ADOPTED", "ACCEPTED", "DEMONSTRATED", "PROPOSED", "STALLED", "RETIRED"]
@@ -27,56 +166,276 @@ def walk_files():
             folders.clear()
 
 
-_field = lambda x: re.compile(r'^[ \t]*[-*][ \t]*' + x + '[ \t]*:[ \t*](.*?)$', re.I | re.M)
 _title_pat = re.compile(r'\s*#[ \t]*(?:(?:Aries )?RFC )?(\d\d\d\d)[ \t]*:[ \t]*(.*?)$', re.I | re.M)
-_author_pat = _field('Authors?')
-_status_pat = _field('Status')
-_since_pat = _field('(?:Since|Status[-_ ]?Date)')
-_status_note_pat = _field('Status[-_ ]?Note')
-_start_date_pat = _field('Start[-_ ]?Date')
-_supersedes_pat = _field('Supersedes')
-_superseded_by_pat = _field('Superseded[-_ ]?By')
-_tags_pat = _field('Tags')
 _status_val_pat = re.compile(r'\[[ \t]*(\w+)')
 
-_extractors = [
-    _author_pat, _status_pat, _since_pat, _status_note_pat, _start_date_pat, _supersedes_pat, _superseded_by_pat, _tags_pat
+# Metadata fields in the order parse_rfc() wants them, with the label each may carry.
+_field_labels = [
+    ('authors', 'Authors?'),
+    ('status', 'Status'),
+    ('since', '(?:Since|Status[-_ ]?Date)'),
+    ('status_note', 'Status[-_ ]?Note'),
+    ('start_date', 'Start[-_ ]?Date'),
+    ('supersedes', 'Supersedes'),
+    ('superseded_by', 'Superseded[-_ ]?By'),
+    ('tags', 'Tags'),
 ]
+_field_names = [name for name, label in _field_labels]
+
+# One pattern for every "- Label: value" line plus the Implementations header, so the
+# metadata block is tokenized in a single pass. Labels can't overlap, so each line
+# matches at most one alternative.
+_metadata_pat = re.compile(
+    r'^[ \t]*(?:[-*][ \t]*(?:' + '|'.join('(?P<%s>%s)' % x for x in _field_labels) +
+    r')[ \t]*:[ \t*](?P<value>.*?)|(?-i:#+[ \t]*(?P<impl>Implementations?)[ \t]*))$', re.I | re.M)
+
+
+def scan_metadata(txt):
+    """
+    Walk the metadata block at the top of an RFC once. Return a (fields, content_idx,
+    impl_idx) triple, where fields maps each name in _field_names to its first value
+    ('' if absent), content_idx is where the first ## section starts, and impl_idx is
+    where the Implementations header ends (-1 if absent).
+    """
+    fields = dict.fromkeys(_field_names, '')
+    found = set()
+    content_idx = txt.find('\n##')
+    end = len(txt) if content_idx == -1 else content_idx
+    impl_idx = -1
+    for m in _metadata_pat.finditer(txt, 0, end):
+        if m.group('impl'):
+            if impl_idx == -1:
+                impl_idx = m.end()
+            continue
+        for name in _field_names:
+            if m.group(name) is not None:
+                break
+        if name not in found:
+            found.add(name)
+            fields[name] = m.group('value')
+            if len(found) == len(_field_names) and impl_idx > -1:
+                break
+    if impl_idx == -1 and content_idx > -1:
+        impl_idx = _find_impl_header(txt, content_idx)
+    return fields, content_idx, impl_idx
+
+
+def parse_rfc(abspath, txt):
+    """
+    Build an RFC tuple from the text of the RFC at abspath.
+    """
+    m = _title_pat.search(txt)
+    if m:
+        num, title = m.group(1), m.group(2)
+    else:
+        num, title = '', ''
+    fields, content_idx, impl_idx = scan_metadata(txt)
+    rpath = relpath(abspath)
+    segments = rpath.split('/')
+    folder = segments[-2]
+    category = segments[-3]
+    status = fields['status']
+    m = _status_val_pat.search(status)
+    if m:
+        status = m.group(1)
+    return RFC.lazy(fields['tags'], txt[impl_idx:] if impl_idx > -1 else None, title=title, abspath=abspath,
+                    relpath=rpath, category=category, folder=folder, num=num, authors=fields['authors'],
+                    status=status, since=fields['since'], status_note=fields['status_note'],
+                    start_date=fields['start_date'], supersedes=fields['supersedes'],
+                    superseded_by=fields['superseded_by'], content_idx=content_idx)
+
+
+def read_rfc(abspath):
+    """
+    Read and parse the RFC at abspath.
+    """
+    with open(abspath, 'rt', encoding='utf-8') as f:
+        txt = f.read()
+    return parse_rfc(abspath, txt)
+
 
-def walk():
+def cache_file():
     """
-    Generate an RFC tuple for every RFC in the repo.
+    Where walk() keeps parsed metadata between runs.
     """
+    return os.path.join(root_folder, '.cache', 'rfcs.json')
+
+
+def parser_version():
+    # Any edit to this module may change what gets parsed, so it invalidates the cache.
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def load_cache():
+    """
+    Return {relpath: [mtime_ns, size, fields]} from the walk() cache, or {} if it is
+    missing, unreadable, or was written by a different version of this module.
+    """
+    try:
+        with open(cache_file(), 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == parser_version():
+            return data['rfcs']
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    return {}
+
+
+def save_cache(entries):
+    fname = cache_file()
+    os.makedirs(os.path.dirname(fname), exist_ok=True)
+    tmp_fname = '%s.%d.tmp' % (fname, os.getpid())
+    with open(tmp_fname, 'wt', encoding='utf-8') as f:
+        json.dump({'version': parser_version(), 'rfcs': entries}, f)
+    os.replace(tmp_fname, fname)
+
+
+def _read_in_root(folder, abspath):
+    # Worker processes get root_folder with each task, so relpaths agree with the
+    # parent even under spawn. (ProcessPoolExecutor only takes an initializer from 3.7.)
+    global root_folder
+    root_folder = folder
+    return read_rfc(abspath)
+
+
+def _read_all(paths, workers):
+    if workers and workers > 1 and len(paths) > 1:
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            yield from pool.map(functools.partial(_read_in_root, root_folder), paths,
+                                chunksize=max(1, len(paths) // (workers * 4)))
+    else:
+        yield from map(read_rfc, paths)
+
+
+def walk(cache=True, workers=None):
+    """
+    Generate an RFC tuple for every RFC in the repo. Unless cache is False, RFCs
+    whose README.md has the same mtime and size as on the previous walk are loaded
+    from the cache instead of being parsed again. If workers > 1, the RFCs that do
+    need parsing are spread across that many processes; the order of the results
+    is the same either way.
+    """
+    old = load_cache() if cache else {}
+    new = {}
+    found = []
     for abspath in walk_files():
-        with open(abspath, 'rt', encoding='utf-8') as f:
-            txt = f.read()
-        m = _title_pat.search(txt)
-        if m:
-            num, title = m.group(1), m.group(2)
-        else:
-            num, title = '', ''
-        fields = []
-        for ex in _extractors:
-            m = ex.search(txt)
-            if m:
-                fields.append(m.group(1))
-            else:
-                fields.append('')
         rpath = relpath(abspath)
-        segments = rpath.split('/')
-        folder = segments[-2]
-        category = segments[-3]
-        status = fields[1]
-        m = _status_val_pat.search(status)
-        if m:
-            status = m.group(1)
-        tags = [unlink_tag(x) for x in fields[7].split(',')]
-        content_idx = txt.find('\n##')
-        impl_table = get_impl_table(txt)
-        impl_count = len(impl_table) if impl_table else 0
-        x = RFC(title, abspath, rpath, category, folder, num, fields[0], status, fields[2],
-                fields[3], fields[4], fields[5], fields[6], tags, content_idx, impl_count, impl_table)
+        st = os.stat(abspath)
+        entry = old.get(rpath)
+        if not (entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size):
+            entry = None
+        found.append((abspath, rpath, st, entry))
+    parsed = _read_all([abspath for abspath, rpath, st, entry in found if entry is None], workers)
+    for abspath, rpath, st, entry in found:
+        if entry:
+            x = RFC.lazy(abspath=abspath, **entry[2])
+        else:
+            x = next(parsed)
+            entry = [st.st_mtime_ns, st.st_size, x.cache_state()]
+        new[rpath] = entry
         yield x
+    parsed.close()
+    if cache and new != old:
+        try:
+            save_cache(new)
+        except OSError:
+            pass
+
+
+
+Catalog = collections.namedtuple('Catalog', 'all by_status by_tag')
+
+
+def catalog(found):
+    """
+    Sort RFCs by number and group them by status and by tag in one pass. Every status
+    in status_list has a list in by_status, even if it is empty.
+    """
+    all = sorted(found, key=lambda x: x.num)
+    by_status = {status: [] for status in status_list}
+    by_tag = {}
+    for rfc in all:
+        by_status.setdefault(rfc.status, []).append(rfc)
+        for tag in rfc.tags:
+            if tag:
+                by_tag.setdefault(tag, []).append(rfc)
+    return Catalog(all, by_status, by_tag)
+
+
+def digests_file(folder):
+    """
+    Where write_if_changed() records what it last wrote to each generated file in folder.
+    """
+    return os.path.join(folder, '.cache', 'generated.json')
+
+
+def _load_digests(folder):
+    try:
+        with open(digests_file(folder), 'rt', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_digests(folder, digests):
+    # The digests only save a read next time, so failing to store them is harmless.
+    # Files that have gone away are dropped, so the store doesn't keep growing.
+    digests = {name: x for name, x in digests.items() if os.path.isfile(os.path.join(folder, name))}
+    fname = digests_file(folder)
+    tmp_fname = '%s.%d.tmp' % (fname, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(fname), exist_ok=True)
+        with open(tmp_fname, 'wt', encoding='utf-8') as f:
+            json.dump(digests, f)
+        os.replace(tmp_fname, fname)
+    except OSError:
+        pass
+
+
+def _digest_entry(digest, st):
+    # A file modified within the last couple of seconds could change again without its
+    # mtime moving, so its stat isn't trusted; the next run hashes it instead.
+    if time.time() - st.st_mtime < 2:
+        return [digest, None, None]
+    return [digest, st.st_mtime_ns, st.st_size]
+
+
+def write_if_changed(fname, txt, check=False):
+    """
+    Make fname hold txt, rendered in memory by a generator. The file is only read if
+    it changed since the digest stored on the last write; it is only replaced (atomically)
+    if its content differs. Return None if it was already current, else 'Generated' or
+    'Updated'. If check is True, nothing is written and a stale file returns 'Stale'.
+    The digests are kept beside the output, in digests_file() of its folder.
+    """
+    new = txt.encode('utf-8')
+    digest = hashlib.sha1(new).hexdigest()
+    folder, key = os.path.split(os.path.abspath(fname))
+    digests = _load_digests(folder)
+    try:
+        st = os.stat(fname)
+    except FileNotFoundError:
+        st = None
+    if st and digests.get(key) == [digest, st.st_mtime_ns, st.st_size]:
+        return None
+    if st and st.st_size == len(new):
+        with open(fname, 'rb') as f:
+            current = hashlib.sha1(f.read()).hexdigest() == digest
+        if current:
+            if not check:
+                digests[key] = _digest_entry(digest, st)
+                _save_digests(folder, digests)
+            return None
+    if check:
+        return 'Stale'
+    tmp_fname = '%s.%d.tmp' % (fname, os.getpid())
+    with open(tmp_fname, 'wb') as f:
+        f.write(new)
+    os.replace(tmp_fname, fname)
+    digests[key] = _digest_entry(digest, os.stat(fname))
+    _save_digests(folder, digests)
+    return 'Updated' if st else 'Generated'
 
 
 def unlink_tag(tag):
@@ -87,39 +446,186 @@ def link_tag(tag):
     return '[' + tag + '](/tags.md#' + tag + ')'
 
 _impl_pat = re.compile(r'^[ \t]*#+[ \t]*Implementations?[ \t]*$', re.M)
-_impl_table_head_pat = re.compile(r'^[ \t]*([|][ \t]*)?Name(.*?)[|](.*?)\n[ \t]*([|][ \t]*)?-+(.*?)*[|](.*?)\n', re.M)
-_impl_table_row_pat = re.compile(r'((.*?)[|](.*?))\n')
-
 def get_impl_table(txt):
     """
     Return the impl table for an RFC.
     """
-    m = _impl_pat.search(txt)
-    if m:
-        m = _impl_table_head_pat.search(txt, m.end())
-        if m:
-            i = m.end()
-            rows = []
-            while True:
-                m = _impl_table_row_pat.match(txt, i)
-                if not m: break
-                row = [x.strip() for x in m.group(1).split('|')]
-                try:
-                    if row[0] or row[1]:
-                        rows.append(row)
-                except:
-                    pass
-
-                i = m.end()
+    i = _find_impl_header(txt, 0)
+    if i > -1:
+        return _read_impl_table(txt, i)
+
+
+def _find_impl_header(txt, start):
+    # Same as _impl_pat.search(txt, start).end(), but jumps between occurrences of
+    # the header word instead of trying the pattern at every line.
+    i = start
+    while True:
+        i = txt.find('Implementation', i)
+        if i == -1:
+            return -1
+        line_start = txt.rfind('\n', 0, i) + 1
+        if line_start >= start:
+            m = _impl_pat.match(txt, line_start)
+            if m:
+                return m.end()
+        i += 1
+
+
+_backticks_pat = re.compile('`+')
+
+
+class ImplRow(tuple):
+    """
+    One row of an impl table: a tuple of its stripped cells, normally
+    (name / link, notes), with the parts of the first two cells by name.
+    """
+    __slots__ = ()
+
+    @property
+    def name(self):
+        name, link = split_hyperlink(self[0])
+        return name if name is not None else self[0]
+
+    @property
+    def link(self):
+        return split_hyperlink(self[0])[1]
 
+    @property
+    def notes(self):
+        return self[1] if len(self) > 1 else ''
+
+
+def split_table_row(line):
+    """
+    Split a markdown table row into its stripped cells, in one pass. A pipe only
+    separates cells if it isn't escaped (\\|, which becomes a plain |) or inside a code
+    span. One leading and one trailing pipe are dropped, as markdown does.
+    """
+    # Where each run of backticks starts, by run length. A code span opened by a run
+    # closes at the next run of the same length, so each list is consumed in order.
+    if '`' not in line and '\\' not in line:
+        cells = [x.strip() for x in line.split('|')]
+        return _trim_outer_cells(line, cells)
+    runs = {}
+    for m in _backticks_pat.finditer(line):
+        runs.setdefault(len(m.group()), collections.deque()).append(m.start())
+    cells = []
+    cell = []
+    i = 0
+    n = len(line)
+    while i < n:
+        c = line[i]
+        if c == '\\' and i + 1 < n and line[i + 1] == '|':
+            cell.append('|')
+            i += 2
+        elif c == '`':
+            j = i
+            while j < n and line[j] == '`':
+                j += 1
+            starts = runs[j - i]
+            while starts and starts[0] <= i:
+                starts.popleft()
+            if starts:
+                k = starts.popleft() + j - i
+                cell.append(line[i:k])
+                i = k
+            else:
+                cell.append(line[i:j])
+                i = j
+        elif c == '|':
+            cells.append(''.join(cell).strip())
+            cell = []
+            i += 1
+        else:
+            cell.append(c)
+            i += 1
+    cells.append(''.join(cell).strip())
+    return _trim_outer_cells(line, cells)
+
+
+def _trim_outer_cells(line, cells):
+    stripped = line.strip()
+    if len(cells) > 1 and not cells[0] and stripped.startswith('|'):
+        cells.pop(0)
+    if len(cells) > 1 and not cells[-1] and stripped.endswith('|') and not stripped.endswith('\\|'):
+        cells.pop()
+    return cells
+
+
+def _is_table_head(line):
+    line = line.lstrip(' \t')
+    if line.startswith('|'):
+        line = line[1:].lstrip(' \t')
+    return line.startswith('Name') and '|' in line
+
+
+def _is_table_separator(line):
+    line = line.lstrip(' \t')
+    if line.startswith('|'):
+        line = line[1:].lstrip(' \t')
+    return line.lstrip(':').startswith('-') and '|' in line
+
+
+def _lines(txt, i):
+    while True:
+        end = txt.find('\n', i)
+        if end == -1:
+            yield txt[i:]
+            return
+        yield txt[i:end]
+        i = end + 1
+
+
+def _impl_table_text(txt):
+    # The lines of txt that _read_impl_table(txt, 0) reads its table from (from the
+    # header row through the last row), or '' if it has no table.
+    prev = start = None
+    prev_pos = pos = 0
+    for line in _lines(txt, 0):
+        if start is not None:
+            if '|' not in line:
+                return txt[start:pos]
+        elif prev is not None and _is_table_head(prev) and _is_table_separator(line):
+            start = prev_pos
+        prev, prev_pos = line, pos
+        pos += len(line) + 1
+    return txt[start:] if start is not None else ''
+
+
+def _read_impl_table(txt, i):
+    # i is just past the Implementations header. Find the first table whose header
+    # row starts with Name, then read rows until a line without a pipe. Every line is
+    # looked at a bounded number of times, so this is linear in the size of txt.
+    lines = _lines(txt, i)
+    prev = None
+    for line in lines:
+        if prev is not None and _is_table_head(prev) and _is_table_separator(line):
+            rows = []
+            width = len(split_table_row(prev))
+            for line in lines:
+                if '|' not in line:
+                    break
+                cells = split_table_row(line)
+                # Short rows are padded out to the header, as markdown renders them.
+                cells += [''] * (width - len(cells))
+                row = ImplRow(cells)
+                if row[0] or row.notes:
+                    rows.append(row)
             return rows
+        prev = line
+
 
 _test_suite_pat = re.compile('test[ \t]*suite', re.I)
 
+def is_test_suite(impl_row):
+    """Whether an impl table row names a test suite rather than an implementation."""
+    return bool(_test_suite_pat.search(impl_row[0]))
+
+
 def test_suite_impls(rfc, return_matches):
     if rfc.impl_table:
         for row in rfc.impl_table:
-            if bool(_test_suite_pat.search(row[0])) == return_matches:
+            if is_test_suite(row) == return_matches:
                 yield row
 
 
@@ -166,6 +672,29 @@ def split_hyperlink(txt):
     return None, None
 
 
+_author_link_pat = re.compile(r'\[([^\]]*)\]\(([^)]*)\)')
+_author_sep_pat = re.compile(r'[,;&]|\band\b')
+
+def parse_authors(txt):
+    """
+    Split an Authors value into (name, uri) pairs. Authors are separated by commas,
+    semicolons, & or "and" outside of markdown links; uri is None for an author given
+    without a link.
+    """
+    authors = []
+    i = 0
+    for m in _author_link_pat.finditer(txt):
+        authors += [(name, None) for name in _unlinked_authors(txt[i:m.start()])]
+        authors.append((m.group(1).strip(), m.group(2).strip()))
+        i = m.end()
+    authors += [(name, None) for name in _unlinked_authors(txt[i:])]
+    return authors
+
+
+def _unlinked_authors(txt):
+    return [name.strip() for name in _author_sep_pat.split(txt) if name.strip()]
+
+
 def normalize_impl_name(name):
     name = re.sub(r'[^a-zA-Z0-9]', ' ', name.lower())
     name = re.sub(r' {2,}', ' ', name).strip()
@@ -185,3 +714,30 @@ def get_impl_base(uri):
         if m:
             return m.group()
     return uri
+
+
+_link_pat = re.compile(r'\[([^\]]*)\]\(([^)]*)\)')
+# A link to an RFC in this repo's tree: relative, root-relative, or by URL. Other
+# series (indy-hipe, for one) have numbers of their own, so they don't match.
+_rfc_link_pat = re.compile(
+    r'^(?:(?:\.{1,2}/)*|/|https?://github\.com/hyperledger/aries-rfcs/.*?/)(?:(?:concepts|features)/)?(\d{4})-')
+_scheme_pat = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+_repo_url_pat = re.compile(r'^https?://github\.com/hyperledger/aries-rfcs(?:[/#?]|$)')
+
+def supersedes_links(txt):
+    """
+    Generate a (num, uri) pair for each link in a Supersedes or Superseded By value.
+    num is None unless the link points at an RFC in this repo.
+    """
+    for m in _link_pat.finditer(txt or ''):
+        uri = m.group(2).strip()
+        found = _rfc_link_pat.match(uri)
+        yield (found.group(1) if found else None), uri
+
+
+def is_repo_link(uri):
+    """
+    Whether uri is a relative or root-relative link, or a URL into this repo, rather
+    than a link to somewhere else.
+    """
+    return not _scheme_pat.match(uri) or bool(_repo_url_pat.match(uri))
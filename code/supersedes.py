@@ -0,0 +1,198 @@
+"""
+Resolve the Supersedes and Superseded By fields of every RFC into a graph keyed by
+RFC number, with each edge running from an older RFC to the newer one that replaces
+it, whichever of the two declared it. The graph reports cycles, links declared on
+only one side, links to RFC numbers that don't exist or that can't be resolved, and
+succession chains that end in a RETIRED RFC, and answers "what is the latest
+successor of RFC N?" by lookup.
+
+A link is taken to replace an RFC completely when it is the only link in the field
+that declares it; "uses concepts from [A] and [B]" replaces neither A nor B outright.
+latest_successor() only follows complete links, and latest_successors() all of them.
+"""
+import argparse
+import sys
+
+import rfcs
+
+
+def _num(num):
+    return '%04d' % int(num)
+
+
+class Graph:
+
+    def __init__(self, found):
+        self.rfcs = {}
+        self.successors = {}
+        self.predecessors = {}
+        # (older, newer) -> the fields that declare the edge: 'supersedes' on newer, 'superseded_by' on older
+        self.declared = {}
+        self.unknown = []
+        # Links into this repo that don't name an RFC number
+        self.unparsed = []
+        # (older, newer) edges that some field declares as a complete replacement
+        self.complete = set()
+        links = []
+        for rfc in found:
+            self.rfcs[rfc.num] = rfc
+            self.successors[rfc.num] = []
+            self.predecessors[rfc.num] = []
+            for field in ['supersedes', 'superseded_by']:
+                found_links = list(rfcs.supersedes_links(getattr(rfc, field)))
+                for num, uri in found_links:
+                    if num:
+                        older, newer = (num, rfc.num) if field == 'supersedes' else (rfc.num, num)
+                        links.append((older, newer, field, uri, len(found_links) == 1))
+                    elif rfcs.is_repo_link(uri):
+                        self.unparsed.append((rfc.num, field, uri))
+        for older, newer, field, uri, complete in links:
+            if older not in self.rfcs or newer not in self.rfcs:
+                self.unknown.append((older if field == 'superseded_by' else newer, field, uri))
+                continue
+            if (older, newer) not in self.declared:
+                self.declared[(older, newer)] = []
+                self.successors[older].append(newer)
+                self.predecessors[newer].append(older)
+            if field not in self.declared[(older, newer)]:
+                self.declared[(older, newer)].append(field)
+            if complete:
+                self.complete.add((older, newer))
+        self.components = self._strongly_connected()
+        self.latest, self.ends = self._latest()
+
+    def _strongly_connected(self):
+        """
+        Tarjan's algorithm, iteratively, over the successor edges. Return the components
+        in reverse topological order: each comes after every component it leads to.
+        """
+        index = {}
+        low = {}
+        stack = []
+        on_stack = set()
+        components = []
+        for root in sorted(self.rfcs):
+            if root in index:
+                continue
+            work = [(root, iter(self.successors[root]))]
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, children = work[-1]
+                child = next(children, None)
+                if child is not None:
+                    if child not in index:
+                        index[child] = low[child] = len(index)
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self.successors[child])))
+                    elif child in on_stack:
+                        low[node] = min(low[node], index[child])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+        return components
+
+    def _latest(self):
+        """
+        Map every RFC to its latest successor along complete links, and to all the RFCs
+        at the ends of its chains of successors. An RFC whose complete successors lead to
+        different places, or that has none, is its own latest successor. Components are
+        visited after everything they lead to, so each one is answered from its exits.
+        """
+        latest = {}
+        ends = {}
+        for component in self.components:
+            members = set(component)
+            exits = [(m, x) for m in component for x in self.successors[m] if x not in members]
+            answers = {latest[x] for m, x in exits if (m, x) in self.complete}
+            answer = answers.pop() if len(answers) == 1 else None
+            found = set()
+            for m, x in exits:
+                found.update(ends[x])
+            found = tuple(sorted(found or members))
+            for member in component:
+                latest[member] = answer or member
+                ends[member] = found
+        return latest, ends
+
+    def latest_successor(self, num):
+        """
+        Return the number of the newest RFC that (transitively) supersedes num completely,
+        or num itself.
+        """
+        num = _num(num)
+        return self.latest.get(num, num)
+
+    def latest_successors(self, num):
+        """Return the numbers of the RFCs at the ends of all of num's chains of successors."""
+        num = _num(num)
+        return self.ends.get(num, (num,))
+
+    def cycles(self):
+        """Return the components in which RFCs supersede each other, directly or indirectly."""
+        return [x for x in self.components if len(x) > 1 or x[0] in self.successors[x[0]]]
+
+    def one_sided(self):
+        """Yield (older, newer, field) for each edge declared only by the field on one of its ends."""
+        for (older, newer), fields in sorted(self.declared.items()):
+            if len(fields) == 1:
+                yield older, newer, fields[0]
+
+    def retired_chains(self):
+        """Yield (num, end) for each superseded RFC and each of its chains of successors that ends in a RETIRED RFC."""
+        for num in sorted(self.rfcs):
+            if self.successors[num]:
+                for end in self.ends[num]:
+                    if self.rfcs[end].status == 'RETIRED':
+                        yield num, end
+
+    def problems(self):
+        for cycle in self.cycles():
+            yield 'error', 'RFCs %s supersede each other in a cycle' % ' -> '.join(cycle)
+        for num, field, uri in self.unknown:
+            yield 'error', 'RFC %s %s %s, which is not an RFC in this repo' % (num, field.replace('_', ' '), uri)
+        for num, field, uri in self.unparsed:
+            yield 'error', 'RFC %s %s %s, which does not name an RFC' % (num, field.replace('_', ' '), uri)
+        for older, newer, field in self.one_sided():
+            if field == 'supersedes':
+                yield 'warning', 'RFC %s supersedes RFC %s, but %s has no Superseded By link back' % (newer, older, older)
+            else:
+                yield 'warning', 'RFC %s is superseded by RFC %s, but %s has no Supersedes link back' % (older, newer, newer)
+        for num, latest in self.retired_chains():
+            yield 'warning', 'RFC %s is superseded by a chain that ends in RETIRED RFC %s' % (num, latest)
+
+
+def main(argv):
+    ap = argparse.ArgumentParser('Check the Supersedes / Superseded By links between RFCs')
+    ap.add_argument('--latest', metavar='NUM', nargs='+', help='print the latest successor of each RFC instead')
+    ap.add_argument('--all', action='store_true',
+                    help='with --latest, print the ends of every chain of successors, not just complete ones')
+    args = ap.parse_args(argv)
+    graph = Graph(rfcs.walk())
+    if args.latest:
+        for num in args.latest:
+            found = graph.latest_successors(num) if args.all else [graph.latest_successor(num)]
+            print('%s %s' % (_num(num), ' '.join(found)))
+        return 0
+    errors = 0
+    for level, msg in graph.problems():
+        print('%s: %s' % (level, msg))
+        errors += level == 'error'
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,102 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+# We're not using python packages, so we have to solve the path problem the old way.
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import aipUpdates
+
+GIT_ENV = dict(os.environ, GIT_AUTHOR_NAME='t', GIT_AUTHOR_EMAIL='t@example.com',
+               GIT_COMMITTER_NAME='t', GIT_COMMITTER_EMAIL='t@example.com')
+
+
+def git(*args):
+    return subprocess.run(['git'] + list(args), env=GIT_ENV, stdout=subprocess.PIPE, check=True).stdout.decode().strip()
+
+
+def write(path, txt):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wt', encoding='utf-8') as f:
+        f.write(txt)
+
+
+def commit(msg):
+    git('add', '-A')
+    git('commit', '-q', '-m', msg)
+    return git('rev-parse', 'HEAD')
+
+
+@pytest.fixture
+def aip_repo(tmp_path, monkeypatch):
+    """A repo where AIP 2.0 pins features/0001-a and features/0002-b, and 0001-a has changed since."""
+    monkeypatch.chdir(tmp_path)
+    git('init', '-q')
+    # Rather than init -b, which needs git 2.28
+    git('symbolic-ref', 'HEAD', 'refs/heads/main')
+    write('features/0001-a/README.md', '# Aries RFC 0001: A\n')
+    write('features/0002-b/README.md', '# Aries RFC 0002: B\n')
+    pinned = commit('first')
+    write('features/0001-a/README.md', '# Aries RFC 0001: A\n\nMore.\n')
+    changed = commit('change a')
+    write(aipUpdates.aip_path, '### Aries Interop Profile Version: 2.0\n\n'
+          'Feature | [0001-a](https://github.com/x/y/tree/%s/features/0001-a)\n'
+          'Feature | [0002-b](https://github.com/x/y/tree/%s/features/0002-b)\n'
+          'Feature | [0003-c](https://github.com/x/y/tree/%s/features/0003-c)\n' % (pinned, pinned, 'f' * 40))
+    commit('aip')
+    return pinned, changed
+
+
+def test_changed_rfcs(aip_repo, capsys):
+    pinned, changed = aip_repo
+    aipUpdates.main([])
+    out, err = capsys.readouterr()
+    assert out == ('# Aries Interop Profile: 2.0\n'
+                   '>>>>>>>> Changed protocol: features/0001-a, latest commit to protocol: %s\n' % changed)
+    assert 'commit %s for features/0003-c is not in this clone' % ('f' * 40) in err
+
+    repo = aipUpdates.AipRepo()
+    try:
+        assert repo.changed(pinned, 'features/0001-a') and not repo.changed(pinned, 'features/0002-b')
+        assert repo.objects.get('main:features/0002-b/README.md')[2] == b'# Aries RFC 0002: B\n'
+        assert repo.objects.get('main:no/such/file') is None
+    finally:
+        repo.close()
+
+
+def test_previous_version_is_read_from_git(aip_repo, capsys, monkeypatch):
+    pinned, changed = aip_repo
+    aip_commit = git('rev-parse', 'HEAD')
+    write(aipUpdates.aip_path, '### Aries Interop Profile Version: 3.0\n\n### Previous Versions\n\n'
+          '- [2.0](https://github.com/x/y/tree/%s/concepts/0302-aries-interop-profile)\n' % aip_commit)
+    commit('aip 3.0')
+    def offline(cmd, *args, **kwargs):
+        assert cmd[0] != 'curl', 'tried to download ' + cmd[-1]
+        return real_run(cmd, *args, **kwargs)
+    real_run = subprocess.run
+    monkeypatch.setattr(aipUpdates.subprocess, 'run', offline)
+    aipUpdates.main(['-v', '2.0'])
+    out = capsys.readouterr().out
+    assert out.startswith('# Aries Interop Profile: 2.0\n>>>>>>>> Changed protocol: features/0001-a')
+    assert aipUpdates._aip_at_commit[aip_commit][0] == '### Aries Interop Profile Version: 2.0\n'
+
+
+def test_json_report_covers_every_version(aip_repo, capsys):
+    pinned, changed = aip_repo
+    aip_commit = git('rev-parse', 'HEAD')
+    write(aipUpdates.aip_path, '### Aries Interop Profile Version: 3.0\n\n'
+          'Feature | [0002-b](https://github.com/x/y/tree/%s/features/0002-b)\n\n### Previous Versions\n\n'
+          '- [2.0](https://github.com/x/y/tree/%s/concepts/0302-aries-interop-profile)\n' % (changed, aip_commit))
+    commit('aip 3.0')
+    aipUpdates.main(['--format', 'json', '--all-versions', '-j', '2'])
+    records = json.loads(capsys.readouterr().out)
+    assert [(x['aip'], x['rfc'], x['changed']) for x in records] == [
+        ('3.0', 'features/0002-b', False), ('2.0', 'features/0001-a', True),
+        ('2.0', 'features/0002-b', False), ('2.0', 'features/0003-c', None)]
+    assert records[1]['pinned'] == pinned and records[1]['latest'] == changed
+    assert records[1]['diffstat'] == {'files': 1, 'insertions': 2, 'deletions': 0}
+    assert records[0]['diffstat'] is None
+    # Unchanged RFCs still report the branch's latest commit to them.
+    assert records[0]['latest'] == records[2]['latest'] == pinned and records[3]['latest'] is None
@@ -0,0 +1,161 @@
+import http.server
+import os
+import pytest
+import socketserver
+import sys
+import tempfile
+import threading
+
+# We're not using python packages, so we have to solve the path problem the old way.
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import check_links
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    heads = []
+
+    def do_HEAD(self):
+        self.heads.append(self.path)
+        self.send_response(200 if self.path.startswith('/ok') else 404)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+# http.server.ThreadingHTTPServer only exists from Python 3.7.
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def stub_server():
+    StubHandler.heads = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    t = threading.Thread(target=server.serve_forever, daemon=True)
+    t.start()
+    yield 'http://127.0.0.1:%d' % server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def corpus(monkeypatch):
+    x = tempfile.TemporaryDirectory()
+    monkeypatch.setattr(check_links, 'ROOT_FOLDER', x.name)
+
+    def write(relpath, txt):
+        path = os.path.join(x.name, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wt', encoding='utf-8') as f:
+            f.write(txt)
+
+    yield write
+    x.cleanup()
+
+
+def test_full_check_probes_each_site_once(stub_server, corpus, capsys):
+    corpus('features/0001-a/README.md', '# RFC 0001: A\n[ok](%s/ok) [ok again](%s/ok#top) [gone](%s/gone)\n'
+           % (stub_server, stub_server, stub_server))
+    corpus('features/0002-b/README.md', '# RFC 0002: B\n[ok](%s/ok) [gone](%s/gone)\n' % (stub_server, stub_server))
+    assert check_links.main(full_check=True, workers=4, per_host=2) == 2
+    assert sorted(StubHandler.heads) == ['/gone', '/ok']
+    out = capsys.readouterr().out
+    assert '[gone](%s/gone) returns HTTP status code 404' % stub_server in out
+
+
+def test_web_cache_skips_fresh_results(stub_server, corpus, capsys):
+    corpus('features/0001-a/README.md', '# RFC 0001: A\n[ok](%s/ok) [gone](%s/gone)\n' % (stub_server, stub_server))
+    assert check_links.main(full_check=True) == 1
+    assert sorted(StubHandler.heads) == ['/gone', '/ok']
+
+    StubHandler.heads = []
+    assert check_links.main(full_check=True) == 1
+    assert StubHandler.heads == []
+
+    # Failures expire on their own schedule.
+    assert check_links.main(full_check=True, web_cache=check_links.WebCache(fail_ttl=0)) == 1
+    assert StubHandler.heads == ['/gone']
+
+    StubHandler.heads = []
+    assert check_links.main(full_check=True, web_cache=check_links.WebCache(refresh=True)) == 1
+    assert sorted(StubHandler.heads) == ['/gone', '/ok']
+
+
+def test_anchor_index():
+    md = '# Top Level\n\ntext\n\n## Sub-section: Details_2\n[ref]: # Ref Heading\n'
+    assert check_links.get_anchors(md, 'text/markdown') == {'top-level', 'sub-section-details_2', 'ref-heading'}
+    assert check_links.fragment_in_content('sub-section-details_2', md, 'text/markdown')
+    assert not check_links.fragment_in_content('details', md, 'text/markdown')
+    html = '<p><A class="x" NAME="Intro">x</a><a\nname=\'usage\' id="u"></a><a href="#intro">'
+    assert check_links.get_anchors(html, 'text/html') == {'intro', 'usage'}
+    assert check_links.fragment_in_content('INTRO', html, 'text/html')
+    assert not check_links.fragment_in_content('u', html, 'text/html')
+
+
+def test_since_checks_changed_files_and_their_linkers(corpus, monkeypatch):
+    corpus('features/0001-a/README.md', '# RFC 0001: A\n## Usage\n')
+    corpus('features/0002-b/README.md', '# RFC 0002: B\n[a](../0001-a/README.md#usage)\n')
+    corpus('features/0003-c/README.md', '# RFC 0003: C\n[b](../0002-b/README.md)\n')
+    root = check_links.ROOT_FOLDER
+    for cmd in ['git init -q', 'git add -A', 'git -c user.name=x -c user.email=x@x commit -q -m x']:
+        assert os.system('cd "%s" && %s' % (root, cmd)) == 0
+    checked = []
+    real_check_links = check_links.check_links
+    def check(fname, *args):
+        checked.append(check_links.repo_relpath(fname))
+        return real_check_links(fname, *args)
+    monkeypatch.setattr(check_links, 'check_links', check)
+
+    # No saved graph yet, so everything gets checked.
+    assert check_links.main(since='HEAD') == 0
+    assert len(checked) == 3
+
+    checked.clear()
+    corpus('features/0001-a/README.md', '# RFC 0001: A\n## How to use\n')
+    assert check_links.main(since='HEAD') == 1
+    assert sorted(checked) == ['features/0001-a/README.md', 'features/0002-b/README.md']
+
+
+def test_graph_export(corpus, tmp_path):
+    corpus('features/0001-a/README.md', '# RFC 0001: A\n## Usage\n[b](../0002-b/README.md) [w](https://example.com/x)\n')
+    corpus('features/0002-b/README.md', '# RFC 0002: B\n[a](../0001-a/README.md#usage) [a](../0001-a/README.md#nope)\n')
+    corpus('features/0003-c/README.md', '# RFC 0003: C\n[self](#rfc-0003-c)\n')
+    export = str(tmp_path / 'graph.jsonl')
+    assert check_links.main(export=export) == 1
+    from link_graph import LinkGraph
+    graph = LinkGraph.load_jsonl(export)
+    assert graph.nodes()['features/0001-a/README.md#usage'] == 'anchor'
+    assert graph.nodes()['https://example.com'] == 'host'
+    assert graph.in_degree()['features/0001-a/README.md'] == 2
+    assert graph.orphans() == ['features/0003-c/README.md']
+    assert [(e.src, e.dst) for e in graph.broken()] == [('features/0002-b/README.md', 'features/0001-a/README.md#nope')]
+
+
+def test_link_results_are_keyed_by_target(corpus):
+    corpus('features/0001-a/README.md', '# RFC 0001: A\n## Usage\n[u](#usage) [n](notes.md#usage)\n')
+    corpus('features/0001-a/notes.md', '## Usage\n')
+    corpus('features/0002-b/README.md', '# RFC 0002: B\n[u](#usage) [n](notes.md#usage)\n')
+    corpus('features/0002-b/notes.md', '## Other\n')
+    cache = check_links.LinkCache()
+    a, b = (os.path.join(check_links.ROOT_FOLDER, x) for x in ['features/0001-a/README.md', 'features/0002-b/README.md'])
+    assert check_links.check_links(a, [], cache, False) == 0
+    # The same links, spelled the same way, point at files without #usage from B.
+    assert check_links.check_links(b, [], cache, False) == 2
+
+
+def test_content_cache_is_bounded(corpus):
+    corpus('features/0001-a/README.md', '# RFC 0001: A\n## Usage\n' + '\u00e9' * 50)
+    corpus('features/0002-b/README.md', '# RFC 0002: B\n[a](../0001-a/README.md#usage) [a](../0001-a/README.md#nope)\n')
+    cache = check_links.LinkCache(budget=50)
+    a = os.path.join(check_links.ROOT_FOLDER, 'features/0001-a/README.md')
+    b = os.path.join(check_links.ROOT_FOLDER, 'features/0002-b/README.md')
+    assert cache.anchors(a, 'text/markdown') == {'rfc-0001-a', 'usage'}
+    cache.read(b)
+    assert list(cache.texts) == [b]
+    assert cache.size == os.path.getsize(b)
+    assert a in cache.anchor_sets
+    assert check_links.main(budget=50) == 1
+    # Without --since or --graph, no link graph is kept.
+    assert not os.path.exists(check_links.graph_file())
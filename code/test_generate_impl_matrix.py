@@ -0,0 +1,33 @@
+import json
+import os
+import sys
+
+# We're not using python packages, so we have to solve the path problem the old way.
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import generate_impl_matrix
+import rfcs
+
+
+def test_matrix_outputs(tmp_path, synthetic_rfc):
+    catalog = rfcs.catalog([
+        synthetic_rfc.parse('9998', '9998-b', title='B', status='ACCEPTED', impls=[
+            '[Agent X](https://x.example/agent) | [test results](https://x.example/results)',
+            '[Other](https://o.example/other) | [MISSING test results](/tags.md#test-anomaly)']),
+        synthetic_rfc.parse('9997', '9997-a', title='A', status='ACCEPTED', impls=['[agent-x](https://x.example/agent) | works']),
+    ])
+    outputs = generate_impl_matrix.render(catalog)
+    impl_list = json.loads(outputs['impl-matrix.json'])
+    assert [x['name'] for x in impl_list] == ['agent-x', 'Other']
+    assert impl_list[0]['spellings'] == ['Agent X', 'agent-x']
+    assert [(x['num'], x['test_results']) for x in impl_list[0]['rfcs']] == [
+        ('9997', None), ('9998', 'https://x.example/results')]
+    assert impl_list[1]['rfcs'][0]['test_results'] is None
+    assert outputs['impl-matrix.csv'] == ('RFC,Title,Status,agent-x,Other\n'
+                                          '9997,A,ACCEPTED,yes,\n'
+                                          '9998,B,ACCEPTED,https://x.example/results,yes\n')
+    assert '[9998: B](/features/9998-b/README.md) | ACCEPTED | [test results](https://x.example/results)\n' \
+        in outputs['impl-matrix.md']
+
+    out_folder = str(tmp_path / 'matrix')
+    assert set(generate_impl_matrix.write(out_folder, catalog).values()) == {'Generated'}
+    assert set(generate_impl_matrix.write(out_folder, catalog).values()) == {None}
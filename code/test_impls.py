@@ -0,0 +1,27 @@
+import os
+import sys
+
+# We're not using python packages, so we have to solve the path problem the old way.
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import impls
+
+
+def test_registry_reports_each_kind_of_inconsistency():
+    registry = impls.Registry()
+    registry.add('features/0001-a/README.md', 1, 'Aries Cloud Agent - Python', 'https://github.com/hyperledger/aries-cloudagent-python')
+    registry.add('features/0002-b/README.md', 2, 'Aries Cloud Agent Python', 'https://github.com/hyperledger/aries-cloudagent-python/tree/main')
+    registry.add('features/0002-b/README.md', 3, 'Agent X', 'https://x.example/agent?v=1')
+    registry.add('features/0003-c/README.md', 1, 'Agent Y', 'https://x.example/agent')
+    registry.add('features/0003-c/README.md', 2, 'Agent Z', 'https://z.example/one')
+    registry.add('features/0004-d/README.md', 1, 'Agent Z', 'https://z2.example/two')
+
+    assert [(k, v) for k, v, refs in registry.name_variants()] == [
+        ('aries cloud agent python', ['Aries Cloud Agent - Python', 'Aries Cloud Agent Python'])]
+    assert [(k, v) for k, v, refs in registry.sites_with_many_names()] == [
+        ('https://x.example/agent', ['agent x', 'agent y'])]
+    assert [(k, v) for k, v, refs in registry.names_with_many_sites()] == [
+        ('agent z', ['https://z.example/one', 'https://z2.example/two'])]
+    problems = list(registry.problems())
+    assert problems[0] == ('features/0001-a, impl row 1\nfeatures/0002-b, impl row 2:\n'
+                           '  inconsistent variants on impl name: "Aries Cloud Agent - Python", "Aries Cloud Agent Python"')
+    assert len(problems) == 3
@@ -0,0 +1,37 @@
+import os
+import sys
+
+# We're not using python packages, so we have to solve the path problem the old way.
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import link_tags
+import rfcs
+
+
+def test_bulk_link_tags(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(rfcs, 'root_folder', str(tmp_path))
+    texts = {
+        'features/9998-plain': '# Aries RFC 9998: Café\r\n- Tags: feature, protocol\r\n\r\n## Summary\r\n',
+        'features/9999-linked': '# Aries RFC 9999: Done\n- Tags: [feature](/tags.md#feature)\n',
+    }
+    paths = {}
+    for folder, txt in texts.items():
+        os.makedirs(os.path.join(str(tmp_path), folder))
+        paths[folder] = os.path.join(str(tmp_path), folder, 'README.md')
+        with open(paths[folder], 'wb') as f:
+            f.write(txt.encode('utf-8'))
+    mtime = os.stat(paths['features/9999-linked']).st_mtime_ns
+
+    assert link_tags.main(dry_run=True) == 1
+    out = capsys.readouterr().out
+    assert '+- Tags: [feature](/tags.md#feature), [protocol](/tags.md#protocol)' in out
+    assert '1 of 2 files would change.' in out
+    with open(paths['features/9998-plain'], 'rb') as f:
+        assert f.read().decode('utf-8') == texts['features/9998-plain']
+
+    assert link_tags.main(workers=2) == 1
+    with open(paths['features/9998-plain'], 'rb') as f:
+        assert f.read().decode('utf-8') == texts['features/9998-plain'].replace(
+            'feature, protocol', '[feature](/tags.md#feature), [protocol](/tags.md#protocol)')
+    assert os.stat(paths['features/9999-linked']).st_mtime_ns == mtime
+    assert link_tags.main() == 0
+    assert sorted(os.listdir(os.path.dirname(paths['features/9998-plain']))) == ['README.md']
@@ -0,0 +1,52 @@
+import json
+import os
+import sys
+
+import pytest
+
+# We're not using python packages, so we have to solve the path problem the old way.
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import lint_rules
+
+
+@pytest.fixture
+def sample(synthetic_rfc):
+    return synthetic_rfc.parse(authors='alice@example.com', status='ACCEPTED',
+                               tags=['feature', 'protocol', 'test-anomaly'],
+                               impls=['[Agent X](https://x.example) | [MISSING test results](/tags.md#test-anomaly)'])
+
+
+def test_findings_and_levels(sample):
+    findings = lint_rules.Linter().lint(sample)
+    assert [(f.rule, f.level) for f in findings] == [
+        ('authors', 'error'), ('test-suite-impl', 'warning'), ('test-results-links', 'warning')]
+    assert findings[0] == ('authors', 'error', 'features/9999-sample/README.md', 'email is not clickable')
+
+
+def test_fields_are_read_once_and_rules_are_timed(monkeypatch, sample):
+    calls = []
+    monkeypatch.setitem(lint_rules.DERIVED, 'other_impls', lambda rfc: calls.append(rfc) or [])
+    linter = lint_rules.Linter(['proposed-impls', 'test-results-links'], timing=True)
+    assert linter.lint(sample) == []
+    assert len(calls) == 1
+    assert set(linter.timings) == {'proposed-impls', 'test-results-links'}
+    with pytest.raises(ValueError):
+        lint_rules.Linter(['no-such-rule'])
+    with pytest.raises(ValueError):
+        lint_rules.rule('bad', 'no_such_field')(lambda x: None)
+
+
+def test_sarif_and_json(tmp_path, sample):
+    linter = lint_rules.Linter(['authors'])
+    findings = linter.lint(sample)
+    sarif = lint_rules.to_sarif(findings, linter.rules)
+    result = sarif['runs'][0]['results'][0]
+    assert result['ruleId'] == 'authors' and result['level'] == 'error'
+    assert result['locations'][0]['physicalLocation']['artifactLocation']['uri'] == 'features/9999-sample/README.md'
+    assert [r['id'] for r in sarif['runs'][0]['tool']['driver']['rules']] == ['authors']
+
+    out = str(tmp_path / 'lint.json')
+    lint_rules.main(['--format', 'json', '--rule', 'title', '--timing', '-o', out])
+    with open(out, encoding='utf-8') as f:
+        report = json.load(f)
+    assert list(report['timings']) == ['title'] and isinstance(report['findings'], list)
@@ -0,0 +1,34 @@
+import os
+import sys
+
+# We're not using python packages, so we have to solve the path problem the old way.
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import rfc_index
+import rfcs
+
+
+def test_incremental_index(tmp_path, monkeypatch, synthetic_rfc):
+    root = str(tmp_path)
+    monkeypatch.setattr(rfcs, 'root_folder', root)
+    tags = ['feature', 'protocol']
+    synthetic_rfc.write(root, '9997', '9997-old', status='RETIRED', tags=tags, since='2019-05-01')
+    synthetic_rfc.write(root, '9998', '9998-tested', status='ACCEPTED', tags=tags,
+                        fields={'Supersedes': '[RFC 9997](../9997-old/README.md), [HIPE](https://example.com/hipe)'},
+                        impls=['[Aries Protocol Test Suite](https://example.com/apts) | passes'])
+    synthetic_rfc.write(root, '9999', '9999-untested', status='ACCEPTED', tags=tags, since='2024-06-01')
+    db = rfc_index.connect()
+    assert os.path.isfile(rfc_index.default_db_file())
+
+    assert [r['num'] for r in rfc_index.without_test_suite(db)] == ['9999']
+    assert [r['num'] for r in rfc_index.by_tag(db, 'protocol', since='2024-01-01')] == ['9998', '9999']
+    assert [r['num'] for r in rfc_index.by_status(db, 'RETIRED')] == ['9997']
+    assert [tuple(r) for r in rfc_index.query(db, 'SELECT num, uri FROM supersedes')] == [
+        ('9997', '../9997-old/README.md'), (None, 'https://example.com/hipe')]
+    assert rfc_index.refresh(db) == (0, 0)
+
+    synthetic_rfc.write(root, '9999', '9999-untested', status='STALLED', tags=tags, since='2024-06-01')
+    os.remove(os.path.join(root, 'features/9997-old/README.md'))
+    assert rfc_index.refresh(db) == (1, 1)
+    assert rfc_index.without_test_suite(db) == []
+    assert [r['num'] for r in rfc_index.by_status(db, 'STALLED')] == ['9999']
+    assert rfc_index.query(db, "SELECT * FROM tags WHERE relpath LIKE '%9997%'") == []
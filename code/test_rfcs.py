@@ -1,6 +1,5 @@
 import os
 import pytest
-import re
 import sys
 import tempfile
 
@@ -16,165 +15,251 @@ def scratch_space():
     x.cleanup()
 
 
-@pytest.mark.skip(reason="using actions index generation")
-def test_index(scratch_space):
-    temp_idx = os.path.join(scratch_space.name, 'index.md')
-    import generate_index
-    generate_index.main(temp_idx)
-    perm_idx = os.path.join(os.path.dirname(__file__), '../index.md')
-    if os.system('diff %s %s' % (perm_idx, temp_idx)):
-        pytest.fail("/index.md needs to be updated. Run python code/generate_index.py.")
+def test_index():
+    import generate_all
+    stale = generate_all.main(check=True)
+    if stale:
+        pytest.fail("%s need to be updated. Run python code/generate_all.py." % ', '.join(stale))
 
 
-def test_links():
+def test_walk_cache(scratch_space, monkeypatch, synthetic_rfc):
+    monkeypatch.setattr(rfcs, 'root_folder', scratch_space.name)
+    synthetic_rfc.write(scratch_space.name)
+    parsed = []
+    real_read_rfc = rfcs.read_rfc
+    def read_rfc(abspath):
+        parsed.append(abspath)
+        return real_read_rfc(abspath)
+    monkeypatch.setattr(rfcs, 'read_rfc', read_rfc)
+
+    cold = list(rfcs.walk())
+    assert os.path.isfile(rfcs.cache_file())
+    warm = list(rfcs.walk())
+    assert warm == cold
+    assert len(parsed) == 1
+    assert warm[0].title == 'Sample' and warm[0].tags == ['feature']
+
+    synthetic_rfc.write(scratch_space.name, title='Sample, Revised')
+    changed = list(rfcs.walk())
+    assert len(parsed) == 2
+    assert changed[0].title == 'Sample, Revised'
+
+
+def test_walk_leaves_impl_tables_unbuilt(scratch_space, monkeypatch, synthetic_rfc):
+    monkeypatch.setattr(rfcs, 'root_folder', scratch_space.name)
+    synthetic_rfc.write(scratch_space.name, impls=['[X](https://x.example) | notes'])
+    for found in (list(rfcs.walk()), list(rfcs.walk())):
+        assert [(x.title, x.status) for x in found] == [('Sample', 'PROPOSED')]
+        assert found[0]._impl_table is rfcs._unset
+    assert found[0].impl_table == [('[X](https://x.example)', 'notes')]
+    assert rfcs.RFC.lazy(abspath=found[0].abspath, **found[0].cache_state()) == found[0]
+
+
+def test_rfc_record_is_lazy_and_tuple_compatible(synthetic_rfc):
+    rfc = synthetic_rfc.parse(authors='[Alice](mailto:alice@example.com), Bob and [Carol](https://c.example)',
+                              impls=['[X](https://x.example) | notes'])
+    abspath = rfc.abspath
+    assert rfc._impl_table is rfcs._unset and rfc._tags is rfcs._unset
+    assert (rfc.num, rfc.title, rfc.status) == ('9999', 'Sample', 'PROPOSED')
+    assert rfc[0] == 'Sample' and rfc[5:8] == ('9999', rfc.authors, 'PROPOSED')
+    assert rfc._impl_table is rfcs._unset and rfc._tags is rfcs._unset
+    assert rfc.impl_count == 1 and rfc.impl_table[0].name == 'X'
+    assert rfc.impl_src is None
+    assert rfcs.RFC.lazy(abspath=abspath, **rfc.cache_state()) == rfc
+    with pytest.raises(ValueError):
+        rfc._replace(impl_count=5)
+    assert rfc.author_list == [('Alice', 'mailto:alice@example.com'), ('Bob', None), ('Carol', 'https://c.example')]
+    assert len(rfc) == 17 and rfc[0] == 'Sample' and rfc[-2] == 1
+    title, abspath2, *rest = rfc
+    assert title == 'Sample' and rest[-1] == rfc.impl_table
+    assert rfc._asdict()['tags'] == ['feature']
+    assert rfc._replace(title='Other') == ('Other',) + tuple(rfc)[1:]
+    assert rfcs.RFC(*rfc) == rfc
+
+
+def test_parallel_walk_keeps_order():
+    assert list(rfcs.walk(cache=False, workers=2)) == list(rfcs.walk(cache=False))
+
+
+def test_single_pass_parse_matches_per_field_regexes():
+    import benchmark
+    for abspath, txt in benchmark.load_corpus():
+        # impl_count and impl_table come from the newer table reader; see below.
+        assert rfcs.parse_rfc(abspath, txt)[:-2] == benchmark.legacy_parse(abspath, txt)[:-2], abspath
+
+
+def test_impl_table_matches_legacy():
+    import benchmark
+    for abspath, txt in benchmark.load_corpus():
+        old = benchmark.legacy_impl_table(txt)
+        new = rfcs.get_impl_table(txt)
+        if old is None:
+            assert new is None, abspath
+            continue
+        # The old reader kept empty cells outside leading and trailing pipes, and
+        # missed a last row with no newline after it.
+        old = [row[1:-1] if len(row) > 2 and not row[0] and not row[-1] else row for row in old]
+        assert [list(row) for row in new[:len(old)]] == old, abspath
+        assert len(new) - len(old) <= (0 if txt.endswith('\n') else 1), abspath
+
+
+def test_impl_table_cells():
+    txt = """## Implementations
+
+| Name / Link | Implementation Notes |
+|---|---|
+| [ACA-Py](https://github.com/x/aca-py) | Uses `a|b` and c\\|d. [test results](/t.md) |
+Plain name | unterminated ` code | span
+[Test Suite](https://github.com/x/suite) |
+
+Not | part of the table
+"""
+    rows = rfcs.get_impl_table(txt)
+    assert rows == [
+        ('[ACA-Py](https://github.com/x/aca-py)', 'Uses `a|b` and c|d. [test results](/t.md)'),
+        ('Plain name', 'unterminated ` code', 'span'),
+        ('[Test Suite](https://github.com/x/suite)', ''),
+    ]
+    assert (rows[0].name, rows[0].link) == ('ACA-Py', 'https://github.com/x/aca-py')
+    assert rows[0].notes.startswith('Uses')
+    assert (rows[1].name, rows[1].link) == ('Plain name', None)
+
+
+def test_impl_table_is_linear():
+    import random
+    import time
+    rnd = random.Random(0)
+    alphabet = ['|', '-', '`', '``', '\\', '\\|', ' ', 'Name', '\n', ':', 'x', '## Implementations\n']
+    for i in range(300):
+        txt = ''.join(rnd.choice(alphabet) for j in range(rnd.randint(0, 200)))
+        for row in rfcs.get_impl_table(txt) or []:
+            assert isinstance(row, rfcs.ImplRow) and (row[0] or row.notes)
+
+    head = '## Implementations\nName | Notes\n--- | ---\n'
+    # Shapes that make backtracking or rescanning parsers go quadratic or worse.
+    shapes = ['`' * 3 + '|', '`|' + '``|', '\\|' + '|', 'x' * 30 + '|\n', '-' * 20 + ' \n']
+    for shape in shapes:
+        def best_time(n):
+            txt = head + shape * n + '\n'
+            best = None
+            for k in range(3):
+                start = time.perf_counter()
+                rfcs.get_impl_table(txt)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            return best
+        small, large = best_time(2000), best_time(16000)
+        # 8x the input should take about 8x as long; allow generous noise.
+        assert large < max(small, 1e-4) * 24, shape
+
+
+def test_benchmark_harness():
+    import benchmark
+    result = benchmark.bench_scale(0.1, memory=False)
+    assert result['rfcs'] == 13
+    assert set(result['stages']) >= {'walk', 'check_links', 'generate_index'}
+    assert rfcs.root_folder == os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+def test_generate_all(scratch_space):
+    import generate_all, generate_index, generate_tags, json
+    catalog = rfcs.catalog(rfcs.walk())
+    assert [rfc.num for rfc in catalog.all] == sorted(rfc.num for rfc in catalog.all)
+    assert sum(len(x) for x in catalog.by_status.values()) == len(catalog.all)
+    assert all('protocol' in rfc.tags for rfc in catalog.by_tag['protocol'])
+
+    generate_all.main(scratch_space.name)
+    outputs = {x: os.path.join(scratch_space.name, x) for x in ['index.md', 'mkdocs_index.yml', 'tags.md']}
+    with open(outputs['index.md'], 'rt', encoding='utf-8') as f:
+        assert f.read() == generate_index.render(catalog)
+    with open(outputs['tags.md'], 'rt', encoding='utf-8') as f:
+        tags = f.read()
+    assert tags.startswith('# Tags on RFCs\n') and tags.count(generate_tags.MARKER) == 1
+    assert generate_tags.render(catalog, tags) == tags
+    mtimes = {x: os.stat(x).st_mtime_ns for x in outputs.values()}
+    generate_all.main(scratch_space.name)
+    assert {x: os.stat(x).st_mtime_ns for x in outputs.values()} == mtimes
+    assert generate_all.main(scratch_space.name, check=True) == []
+
+    # A same-size hand edit still counts as stale, and --check leaves it alone.
+    with open(outputs['index.md'], 'r+t', encoding='utf-8') as f:
+        f.write('X')
+    assert generate_all.main(scratch_space.name, check=True) == ['index.md']
+    with open(outputs['index.md'], 'rt', encoding='utf-8') as f:
+        assert f.read().startswith('X Aries')
+    assert not [x for x in os.listdir(scratch_space.name) if x.endswith('.tmp')]
+
+    # The digests stay with the outputs, and forget files that are gone.
+    os.remove(outputs['tags.md'])
+    rfcs.write_if_changed(outputs['index.md'], generate_index.render(catalog))
+    with open(rfcs.digests_file(scratch_space.name), 'rt', encoding='utf-8') as f:
+        assert set(json.load(f)) == {'index.md', 'mkdocs_index.yml'}
+
+
+# The whole corpus is parsed once per test process, when the tests below are collected;
+# the per-RFC and per-file tests all share it. Ids are stable, so pytest-xdist workers
+# agree on them.
+_corpus = None
+
+
+def corpus():
+    global _corpus
+    if _corpus is None:
+        _corpus = {rfc.relpath: rfc for rfc in rfcs.walk()}
+    return _corpus
+
+
+def rfc_ids():
+    return sorted(corpus())
+
+
+@pytest.fixture(scope='session')
+def link_checker():
     import check_links
-    assert check_links.main() == 0
-
-
-def test_rfc_metadata():
-    errors = []
-
-    def e(rfc, msg):
-        errors.append(rfc.relpath.replace('README.md','') + ': ' + msg)
-
-    def warn(rfc, msg):
-        sys.stderr.write('Warning: ' + rfc.relpath.replace('README.md','') + ': ' + msg + '\n')
-
-    for rfc in rfcs.walk():
-        if not bool(rfc.title): e(rfc, 'no title found')
-        if rfc.category not in rfc.relpath: e(rfc, 'category does not match path')
-        if rfc.category[:-1] not in rfc.tags: e(rfc, 'category not in tags')
-        opposite_category = 'feature' if rfc.category == 'concepts' else 'concept'
-        if opposite_category in rfc.tags: e(rfc, 'opposite category in tags')
-        if rfc.status not in rfcs.status_list: e(rfc, 'status is not canonical')
-        if not re.match(r'\d{4}$', rfc.num): e(rfc, 'num is not 4 digits')
-        if not re.search(r'\d{4}-\d{2}-\d{2}', rfc.since): e(rfc, 'since does not contain yyyy-mm-dd')
-        if rfc.start_date:
-            if not re.search(r'\d{4}-\d{2}-\d{2}', rfc.start_date): e(rfc, 'start_date does not contain yyyy-mm-dd')
-        if bool(rfc.authors):
-            if '@' in rfc.authors:
-                if not re.search(r'\[.*?\]\([^)]+@.*?\)', rfc.authors): e(rfc, 'email is not clickable')
-        else:
-            e(rfc, 'no authors found')
-        if ','.join(rfc.tags) != ','.join(rfc.tags).lower(): e(rfc, 'tags are case-sensitive')
-        if rfc.supersedes:
-            if not re.search(r'\[.*?\]\(.*?\)', rfc.supersedes): e(rfc, 'supersedes does not contain hyperlink')
-        if rfc.superseded_by:
-            if not re.search(r'\[.*?\]\(.*?\)', rfc.superseded_by): e(rfc, 'superseded_by does not contain hyperlink')
-        if rfc.status == 'PROPOSED':
-            for impl in rfcs.test_suite_impls(rfc, False):
-                e(rfc, 'should not be PROPOSED if it has a non-test-suite impl')
-                break
-        # Should this RFC have links to test results?
-        elif rfc.status in ['ACCEPTED', 'ADOPTED'] and 'feature' in rfc.tags and (
-                'protocol' in rfc.tags or 'decorator' in rfc.tags):
-            found_test_suite_in_impls = False
-            for row in rfcs.test_suite_impls(rfc, True):
-                found_test_suite_in_impls = True
-                break
-            if not found_test_suite_in_impls:
-                msg = 'Test suite must be an impl for any protocol- or decorator-related RFC beyond DEMONSTRATED status.'
-                if 'test-anomaly' in rfc.tags:
-                    warn(rfc, msg)
-                else:
-                    e(rfc, msg + ' Tag "test-anomaly" to temporarily override.')
-            for row in rfcs.test_suite_impls(rfc, False):
-                m = rfcs.get_test_results_link(row)
-                # If we lack a link entirely, this is an error, period.
-                # If we have tagged the RFC with "test-anomaly", then it becomes possible to link
-                # the ugly text "MISSING test results" to the test-anomaly tag and have the result
-                # be only a warning. This ugly text+link should only be accepted when the 'test-anomaly'
-                # tag is present.
-                desc = rfcs.describe_impl_row(row)
-                if m is None:
-                    e(rfc, 'Impl "%s" needs a link to test results in its Notes column. Format = [test results](...) or, if RFC is tagged "test-anomaly", [MISSING test results](/tags.md#test-anomaly).' % desc)
-                # Are test results explicitly declared to be missing?
-                elif ('MISSING' in m.group(1) and '/tags.md#test-anomaly' in m.group(2)):
-                    if 'test-anomaly' in rfc.tags:
-                        warn(rfc, 'Impl "%s" needs to replace missing test results with something meaningful.' % desc)
-                    else:
-                        e(rfc, 'Can\'t declare missing tests without the "test-anomaly" tag to make the RFC ugly, so impl "%s" needs a link to test results in its Notes column. Format = [test results](...).' % desc)
+    from link_graph import LinkGraph
+    rfc_names, fnames = check_links.find_corpus()
+    return rfc_names, check_links.LinkCache(), LinkGraph()
+
 
+def _md_files():
+    import check_links
+    return [check_links.repo_relpath(x) for x in check_links.find_corpus()[1]]
+
+
+@pytest.mark.parametrize('md', _md_files())
+def test_links(md, link_checker):
+    import check_links
+    rfc_names, cache, graph = link_checker
+    check_links.check_links(os.path.join(check_links.ROOT_FOLDER, md), rfc_names, cache, False, graph)
+    broken = ['[%s] %s' % (edge.uri, edge.error.strip().splitlines()[-1]) for edge in graph.edges[md] if edge.error]
+    if broken:
+        pytest.fail('\n'.join(broken), pytrace=False)
+
+
+def _fail_or_warn(errors, warnings):
+    for msg in warnings:
+        sys.stderr.write('Warning: ' + msg + '\n')
     if errors:
-        msg = '\n' + '\n'.join(errors)
-        raise BaseException(msg)
+        pytest.fail('\n'.join(errors), pytrace=False)
 
 
-def test_impls():
-    errors = []
-
-    def e(rfc, msg):
-        errors.append(rfc + ': ' + msg)
-
-    pretty_for_normalized_names = {}
-    normalized_for_base_uri = {}
-    base_uri_for_normalized = {}
-    refs = []
-
-    def append_to_dict(dict, key, value, ref):
-        if key not in dict:
-            dict[key] = []
-        list = dict.get(key)
-        if value not in list:
-            list.append(value)
-        refs.append((dict, key, value, ref))
-
-    def track(name, link, path, row_num):
-        ref = path + ', impl row ' + str(row_num)
-        norm_name = rfcs.normalize_impl_name(name)
-        append_to_dict(pretty_for_normalized_names, norm_name, name, ref)
-        base_uri = rfcs.get_impl_base(link)
-        append_to_dict(base_uri_for_normalized, norm_name, base_uri, ref)
-        append_to_dict(normalized_for_base_uri, base_uri, norm_name, ref)
-
-    for abspath in rfcs.walk_files():
-        try:
-            with open(abspath, 'rt', encoding='utf-8') as f:
-                txt = f.read()
-            path = rfcs.relpath(abspath).replace('/README.md', '')
-            impl_table = rfcs.get_impl_table(txt)
-            bad_count = False
-            n = 1
-            for row in impl_table:
-                if len(row) == 2:
-                    cell = row[0].strip()
-                    if cell.startswith('['):
-                        name, link = rfcs.split_hyperlink(cell)
-                        if name and link:
-                            track(name, link, path, n)
-                else:
-                    if (not bad_count):
-                        e(path, 'row %d in impl table does not have 2 columns' % n)
-                        bad_count = True
-                n += 1
-        except:
-            print('Error while processing ' + abspath)
-            raise
-
-    def find_refs(dict, key, value):
-        matches = []
-        for ref in refs:
-            if ref[0] == dict:
-                if ref[1] == key:
-                    if ref[2] in value:
-                        matches.append(ref[3])
-        return matches
-
-    # for key, value in pretty_for_normalized_names.items():
-    #     if len(value) > 1:
-    #         offenders = '\n'.join(find_refs(pretty_for_normalized_names, key, value))
-    #         e(offenders, '\n  inconsistent variants on impl name: %s' % ', '.join(['"%s"' % v for v in value]))
-
-    # for key, value in normalized_for_base_uri.items():
-    #     if len(value) > 1:
-    #         offenders = '\n'.join(find_refs(normalized_for_base_uri, key, value))
-    #         e(offenders, '\n  same site maps to multiple impl names: %s' % ', '.join(['"%s"' % v for v in value]))
-
-    # for key, value in base_uri_for_normalized.items():
-    #     if len(value) > 1:
-    #         offenders = '\n'.join(find_refs(base_uri_for_normalized, key, value))
-    #         e(offenders, '\n  impl name "%s" maps to multiple sites: %s' % (key, ', '.join(['"%s"' % v for v in value])))
+@pytest.mark.parametrize('relpath', rfc_ids())
+def test_rfc_metadata(relpath):
+    import lint_rules
+    findings = lint_rules.Linter().lint(corpus()[relpath])
+    _fail_or_warn([f.message for f in findings if f.level == 'error'],
+                  [relpath + ': ' + f.message for f in findings if f.level != 'error'])
+
+
+@pytest.mark.parametrize('relpath', rfc_ids())
+def test_impl_table_columns(relpath):
+    for n, row in enumerate(corpus()[relpath].impl_table or [], 1):
+        if len(row) != 2:
+            pytest.fail('row %d in impl table does not have 2 columns' % n, pytrace=False)
 
+
+def test_impls():
+    import impls
+    errors = list(impls.Registry.from_rfcs(corpus().values()).problems())
     if errors:
-        msg = '\n' + '\n'.join(errors)
-        raise BaseException(msg)
+        pytest.fail('\n'.join(errors), pytrace=False)
@@ -0,0 +1,56 @@
+import os
+import sys
+
+# We're not using python packages, so we have to solve the path problem the old way.
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import rfcs
+import supersedes
+
+
+def link(num):
+    return '[RFC %s](../%s-x/README.md)' % (num, num)
+
+
+def test_graph(synthetic_rfc):
+    parse = synthetic_rfc.parse
+    graph = supersedes.Graph([
+        parse('9001', fields={'Superseded By': link('9002')}),
+        parse('9002', fields={'Supersedes': link('9001')}),
+        parse('9003', fields={'Supersedes': link('9002')}),
+        parse('9004', status='RETIRED', fields={'Supersedes': link('9003')}),
+        parse('9005', fields={'Supersedes': link('9006')}),
+        parse('9006', fields={'Supersedes': link('9005')}),
+        parse('9007', fields={'Supersedes': link('9005')}),
+        parse('9008', fields={'Supersedes': 'parts of %s and %s' % (link('9002'), link('9000'))}),
+        parse('9009', fields={'Supersedes': '[RFC 9007](/features/9007-x/README.md)'}),
+        parse('9010', fields={'Supersedes': '[notes](../notes.md)'}),
+    ])
+    assert graph.successors['9002'] == ['9003', '9008'] and graph.predecessors['9003'] == ['9002']
+    # 9008 only replaces part of 9002, so the complete chain runs through 9003 alone.
+    assert graph.latest_successor(9001) == graph.latest_successor('9002') == '9004'
+    assert graph.latest_successors('9002') == ('9004', '9008')
+    assert graph.latest_successor('9004') == '9004' and graph.latest_successors('9004') == ('9004',)
+    assert graph.latest_successor('9005') == graph.latest_successor('9006') == '9009'
+    assert graph.latest_successor(1234) == '1234'
+    assert graph.cycles() == [['9005', '9006']]
+    assert ('9001', '9002', 'supersedes') not in list(graph.one_sided())
+    assert ('9007', '9009', 'supersedes') in list(graph.one_sided())
+    assert list(graph.retired_chains()) == [('9001', '9004'), ('9002', '9004'), ('9003', '9004')]
+    assert list(graph.problems())[:3] == [
+        ('error', 'RFCs 9005 -> 9006 supersede each other in a cycle'),
+        ('error', 'RFC 9008 supersedes ../9000-x/README.md, which is not an RFC in this repo'),
+        ('error', 'RFC 9010 supersedes ../notes.md, which does not name an RFC')]
+
+
+def test_long_chain_is_linear(synthetic_rfc):
+    # A chain deep enough to overflow a recursive walk
+    found = [synthetic_rfc.parse('%04d' % n, fields={'Supersedes': link('%04d' % (n - 1))} if n else None)
+             for n in range(5000)]
+    graph = supersedes.Graph(found)
+    assert graph.latest_successor(0) == '4999' and graph.cycles() == []
+
+
+def test_corpus_has_no_supersedes_cycles():
+    graph = supersedes.Graph(rfcs.walk())
+    assert graph.cycles() == [] and graph.unknown == [] and graph.unparsed == []
+    assert graph.latest_successor(37) == '0454' and graph.latest_successor(36) == '0453'
@@ -0,0 +1,45 @@
+import os
+import sys
+
+# We're not using python packages, so we have to solve the path problem the old way.
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import benchmark
+import watch
+
+
+def test_watch_rechecks_only_what_changed(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    benchmark.make_corpus(root, 0.1)
+    with open(os.path.join(root, 'tags.md'), 'wt', encoding='utf-8') as f:
+        f.write('# Tags on RFCs\n')
+    with benchmark.repo_root(root):
+        watcher = watch.Watcher()
+        watcher.start()
+        with open(watcher.report, 'rt', encoding='utf-8') as f:
+            before = f.read()
+        checked = []
+        real_check_links = watch.check_links.check_links
+        def check_links(fname, *args):
+            checked.append(fname)
+            return real_check_links(fname, *args)
+        monkeypatch.setattr(watch.check_links, 'check_links', check_links)
+
+        assert watcher.poll() == ([], [])
+        readme = sorted(watcher.rfcs)[1]
+        with open(readme, 'rt', encoding='utf-8') as f:
+            txt = f.read()
+        with open(readme, 'wt', encoding='utf-8') as f:
+            f.write(txt.replace(': Synthetic ', ': Renamed ', 1) + '[gone](../nowhere/README.md)\n')
+        assert watcher.poll() == ([readme], [])
+        assert readme in checked and len(checked) < len(watcher.stats)
+        with open(os.path.join(root, 'index.md'), 'rt', encoding='utf-8') as f:
+            assert ': Renamed ' in f.read()
+        with open(watcher.report, 'rt', encoding='utf-8') as f:
+            after = f.read()
+        assert '[../nowhere/README.md] does not exist' in after and len(after) > len(before)
+
+        os.remove(readme)
+        assert watcher.poll() == ([], [readme])
+        assert readme not in watcher.rfcs
+        with open(os.path.join(root, 'index.md'), 'rt', encoding='utf-8') as f:
+            assert ': Renamed ' not in f.read()
@@ -0,0 +1,151 @@
+"""
+Keep index.md, mkdocs_index.yml, tags.md and a report of broken links up to date
+while RFCs are being edited. The RFC metadata and the link graph stay in memory;
+every interval the .md files are polled, and only the files that changed, plus
+the files that link to them, are parsed and checked again.
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import check_links
+import generate_all
+import rfcs
+from link_graph import LinkGraph
+
+POLL_INTERVAL = 0.5
+
+
+def report_file():
+    return os.path.join(rfcs.root_folder, '.cache', 'link-errors.txt')
+
+
+def with_folders(paths):
+    """Add the folders that hold paths, since a link to a folder is affected by any change inside it."""
+    found = set()
+    for path in paths:
+        while path and path not in found:
+            found.add(path)
+            path = os.path.dirname(path)
+    return found
+
+
+class Watcher:
+
+    def __init__(self, out_folder=None, report=None, full_check=False):
+        self.out_folder = out_folder or rfcs.root_folder
+        self.report = report or report_file()
+        self.full_check = full_check
+        self.web_cache = check_links.WebCache() if full_check else None
+        self.stats = {}
+        self.rfcs = {}
+        self.graph = LinkGraph()
+        self.cache = check_links.LinkCache()
+
+    def scan(self):
+        """Return {abspath: (mtime_ns, size)} for every .md file under concepts/ and features/."""
+        stats = {}
+        for folder in ['concepts', 'features']:
+            for root, dirs, files in os.walk(os.path.join(rfcs.root_folder, folder)):
+                for file in files:
+                    if file.endswith('.md'):
+                        path = os.path.normpath(os.path.join(root, file)).replace('\\', '/')
+                        try:
+                            st = os.stat(path)
+                        except FileNotFoundError:
+                            continue
+                        stats[path] = (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def start(self):
+        """Load everything once; return the number of broken links."""
+        self.stats = self.scan()
+        self.rfcs = {x.abspath: x for x in rfcs.walk()}
+        self.write_outputs()
+        return self.check(list(self.stats), [])
+
+    def poll(self):
+        """Process whatever changed since the last poll; return (changed, removed) abspaths."""
+        stats = self.scan()
+        changed = [x for x in stats if stats[x] != self.stats.get(x)]
+        removed = [x for x in self.stats if x not in stats]
+        self.stats = stats
+        if changed or removed:
+            self.update(changed, removed)
+        return changed, removed
+
+    def update(self, changed, removed):
+        readmes = set(rfcs.walk_files())
+        index_changed = False
+        for path in changed:
+            if path in readmes:
+                self.rfcs[path] = rfcs.read_rfc(path)
+                index_changed = True
+        for path in removed:
+            index_changed = self.rfcs.pop(path, None) is not None or index_changed
+        if index_changed:
+            self.write_outputs()
+        self.check(changed, removed)
+
+    def write_outputs(self):
+        catalog = rfcs.catalog(self.rfcs.values())
+        for name, txt in generate_all.render_all(catalog).items():
+            fname = os.path.join(self.out_folder, name)
+            if rfcs.write_if_changed(fname, txt):
+                print('Updated %s.' % fname)
+
+    def check(self, changed, removed):
+        """Check the links in changed files and in every file that links to changed or removed ones."""
+        self.cache.forget(changed + removed)
+        affected = with_folders(check_links.repo_relpath(x) for x in changed + removed)
+        for path in removed:
+            self.graph.remove(check_links.repo_relpath(path))
+        wanted = affected | self.graph.linkers_of(affected)
+        fnames = [x for x in self.stats if check_links.repo_relpath(x) in wanted]
+        rfc_names = check_links.find_corpus()[0]
+        # check_links() reports as it goes; the report file is what we keep.
+        with contextlib.redirect_stdout(io.StringIO()):
+            if self.full_check:
+                prober = check_links.WebProber()
+                try:
+                    prober.probe_all(check_links.find_web_uris(fnames, rfc_names, self.cache),
+                                     self.cache, self.web_cache)
+                finally:
+                    prober.close()
+                self.web_cache.save()
+            for fname in fnames:
+                check_links.check_links(fname, rfc_names, self.cache, self.full_check, self.graph)
+        broken = self.graph.broken()
+        os.makedirs(os.path.dirname(self.report), exist_ok=True)
+        with open(self.report + '.tmp', 'wt', encoding='utf-8') as f:
+            for edge in broken:
+                f.write('%s: [%s] %s\n' % (edge.src, edge.uri, edge.error.strip().splitlines()[-1]))
+        os.replace(self.report + '.tmp', self.report)
+        return len(broken)
+
+    def run(self, interval=POLL_INTERVAL):
+        print('%d broken links; see %s. Watching for changes...' % (self.start(), self.report))
+        try:
+            while True:
+                time.sleep(interval)
+                start = time.perf_counter()
+                changed, removed = self.poll()
+                if changed or removed:
+                    print('%d changed, %d removed: %d broken links (%.0f ms)' % (
+                        len(changed), len(removed), len(self.graph.broken()),
+                        (time.perf_counter() - start) * 1000))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser('Regenerate indexes and recheck links as RFCs change')
+    ap.add_argument('--interval', type=float, default=POLL_INTERVAL, help='seconds between polls')
+    ap.add_argument('--report', metavar='FILE', help='where to write broken links (default .cache/link-errors.txt)')
+    ap.add_argument('--full', action='store_true', help='also check links to external websites')
+    ap.add_argument('out_folder', metavar='FOLDER', nargs='?', default=None,
+                    help='write index.md etc. here instead of the repo root')
+    args = ap.parse_args()
+    Watcher(args.out_folder, args.report, args.full).run(args.interval)